@@ -1,11 +1,14 @@
 # api.py
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List
+import json
+from typing import Any, AsyncIterator, Dict, List
 import uuid
 
 import httpx
 
+from http_cache import CacheEntry, HTTPCache
+
 
 @dataclass
 class RecordCreateDTO:
@@ -15,18 +18,64 @@ class RecordCreateDTO:
     measured_at: datetime
 
 
+@dataclass
+class MarketDataDelta:
+    results: List[Dict[str, Any]]
+    deleted_ids: List[int]
+    server_time: str | None
+    not_modified: bool = False
+    validator: CacheEntry | None = None
+
+
 class AuthDegradedError(Exception):
     pass
 
 
+class DeltaUnavailableError(Exception):
+    # updated_since 를 보냈는데 변경분 형식({"results", "deleted_ids", "server_time"})이 아닌 응답
+    pass
+
+
+async def iter_json_array(head: str, texts: AsyncIterator[str]) -> AsyncIterator[Any]:
+    # 최상위 JSON 배열을 원소 단위로 디코딩 (버퍼에는 아직 끝나지 않은 원소 하나 분량만 남는다)
+    decoder = json.JSONDecoder()
+    buffer = head
+    pos = buffer.index("[") + 1
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer):
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                end = None
+            # 숫자는 경계에서 잘려도 디코딩되므로 뒤에 구분자가 보일 때만 원소가 끝난 것으로 본다
+            if end is not None and end < len(buffer) and buffer[end] in " \t\r\n,]":
+                yield item
+                pos = end
+                continue
+
+        text = await anext(texts, None)
+        if text is None:
+            raise ValueError("Truncated JSON array")
+        buffer = buffer[pos:] + text
+        pos = 0
+
+
 class APIClient:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, cache_dir: str | None = None):
         self.base_url = base_url
         self.client = httpx.AsyncClient(base_url=base_url, timeout=10.0)
+        self.http_cache = HTTPCache(cache_dir) if cache_dir else None
 
     async def close(self):
         await self.client.aclose()
 
+    def cache_stats(self) -> dict:
+        return self.http_cache.stats() if self.http_cache is not None else {}
+
     async def retrieve_gateway_self(self, access_token: str) -> Dict[str, Any]:
         headers = {"Authorization": f"Gateway {access_token}"}
         response = await self.client.get("devices/api/gateways/self/", headers=headers)
@@ -34,10 +83,33 @@ class APIClient:
         return response.json()
 
     async def list_gateway_stations(self, access_token: str) -> List[Dict[str, Any]]:
+        return await self.get_cached_json("devices/api/gateways/self/stations/", access_token)
+
+    async def get_cached_json(self, path: str, access_token: str) -> Any:
+        # 작은 읽기 전용 응답은 본문까지 캐시: 304 면 저장해 둔 본문을 그대로 돌려준다
         headers = {"Authorization": f"Gateway {access_token}"}
-        response = await self.client.get("devices/api/gateways/self/stations/", headers=headers)
+        if self.http_cache is None:
+            response = await self.client.get(path, headers=headers)
+            response.raise_for_status()
+            return response.json()
+
+        key = self.http_cache.key(path, access_token)
+        entry = self.http_cache.get(key)
+        if entry is not None and entry.body is None:
+            entry = None
+        headers.update(self.http_cache.conditional_headers(entry))
+        response = await self.client.get(path, headers=headers)
+        self.http_cache.record(response, entry)
+        if response.status_code == 304 and entry is not None:
+            return entry.body
+
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        validator = CacheEntry.from_response(key, response)
+        validator.size = len(response.content)
+        validator.body = data
+        self.http_cache.put(validator)
+        return data
 
     async def send_heartbeat(self, access_token: str) -> Dict[str, Any]:
         headers = {"Authorization": f"Gateway {access_token}"}
@@ -45,32 +117,188 @@ class APIClient:
         response.raise_for_status()
         return response.json()
 
-    async def create_record(self, access_token: str, record: RecordCreateDTO) -> dict:
-        headers = {"Authorization": f"Gateway {access_token}"}
-        payload = {
+    @staticmethod
+    def record_payload(record: RecordCreateDTO) -> Dict[str, Any]:
+        return {
             "uuid": str(record.uuid),
             "rfid_card_uid": record.rfid_card_uid,
             "weight": record.weight,
             "measured_at": record.measured_at.isoformat(),
         }
+
+    async def create_record(self, access_token: str, record: RecordCreateDTO) -> dict:
+        headers = {"Authorization": f"Gateway {access_token}"}
+        payload = self.record_payload(record)
         response = await self.client.post("weighing/api/records/", json=payload, headers=headers)
         response.raise_for_status()
         return response.json()
 
-    async def fetch_species(self, access_token: str) -> List[Dict[str, Any]]:
+    async def create_records_batch(self, access_token: str, records: List[RecordCreateDTO]) -> List[Dict[str, Any]]:
+        # 항목별 결과: [{"uuid": "...", "status": 201, "errors": {...}}, ...]
         headers = {"Authorization": f"Gateway {access_token}"}
-        response = await self.client.get("market/api/species/", headers=headers)
+        payload = {"records": [self.record_payload(record) for record in records]}
+        response = await self.client.post("weighing/api/records/batch/", json=payload, headers=headers)
         response.raise_for_status()
-        return response.json()
-    
-    async def fetch_producers(self, access_token: str) -> List[Dict[str, Any]]:
+        return response.json()["results"]
+
+    @staticmethod
+    def parse_market_data(data: Any, delta_requested: bool) -> tuple[MarketDataDelta, str | None]:
+        # 기준 시각은 서버가 본문에 실어 준 server_time 만 쓴다 (Date 헤더는 조회가 끝난 뒤 시각이라 그 사이 변경을 건너뛴다)
+        # 삭제 목록이 없는 응답은 삭제를 알 수 없으므로 변경분으로 쓰지 않는다
+        if isinstance(data, dict):
+            results, next_url = data["results"], data.get("next")
+            deleted_ids, server_time = data.get("deleted_ids"), data.get("server_time")
+        else:
+            results, next_url, deleted_ids, server_time = data, None, None, None
+        if delta_requested and (deleted_ids is None or server_time is None):
+            raise DeltaUnavailableError("Market data response has no delta shape")
+        return MarketDataDelta(results=results, deleted_ids=deleted_ids or [], server_time=server_time), next_url
+
+    def market_validator(
+        self,
+        path: str,
+        access_token: str,
+        updated_since: str | None,
+        conditional: bool,
+    ) -> tuple[str | None, CacheEntry | None]:
+        # 검증자는 전체 조회에서만 주고받는다: 다른 updated_since 의 검증자로 304 를 받으면 그 사이 변경분을 건너뛴다
+        # (updated_since 를 키에 넣으면 기준 시각마다 항목이 새로 생겨 다시 쓰일 일 없이 쌓이기만 한다)
+        if self.http_cache is None or updated_since is not None:
+            return None, None
+        key = self.http_cache.key(path, access_token)
+        return key, self.http_cache.get(key) if conditional else None
+
+    @staticmethod
+    def not_modified() -> MarketDataDelta:
+        # 기준 시각은 이전 값을 그대로 둔다
+        return MarketDataDelta(results=[], deleted_ids=[], server_time=None, not_modified=True)
+
+    def commit_validator(self, delta: MarketDataDelta):
+        # 테이블 반영이 커밋된 뒤에만 저장: 반영 전에 죽으면 다음 동기화가 304 로 빈 테이블을 건너뛰지 않도록
+        if self.http_cache is not None and delta.validator is not None:
+            self.http_cache.put(delta.validator)
+
+    async def fetch_market_data(
+        self,
+        path: str,
+        access_token: str,
+        updated_since: str | None = None,
+        conditional: bool = False,
+    ) -> MarketDataDelta:
+        # updated_since 가 있으면 그 이후 변경/삭제분만, 없으면 전체 (서버가 변경 이력을 보관하지 않으면 410)
+        # conditional 이면 지난번 검증자를 보내고, 304 면 not_modified 만 표시해 돌려준다
         headers = {"Authorization": f"Gateway {access_token}"}
-        response = await self.client.get("market/api/producers/", headers=headers)
+        params = {"updated_since": updated_since} if updated_since else None
+        key, entry = self.market_validator(path, access_token, updated_since, conditional)
+        if self.http_cache is not None:
+            headers.update(self.http_cache.conditional_headers(entry))
+        response = await self.client.get(path, headers=headers, params=params)
+        if self.http_cache is not None:
+            self.http_cache.record(response, entry)
+        if response.status_code == 304 and entry is not None:
+            return self.not_modified()
+
         response.raise_for_status()
-        return response.json()
+        delta, _ = self.parse_market_data(response.json(), updated_since is not None)
+        if key is not None:
+            delta.validator = CacheEntry.from_response(key, response)
+            delta.validator.size = len(response.content)
+        return delta
+
+    async def iter_market_data_chunks(
+        self,
+        path: str,
+        access_token: str,
+        updated_since: str | None = None,
+        chunk_size: int = 1000,
+        conditional: bool = False,
+    ) -> AsyncIterator[MarketDataDelta]:
+        # 목록 응답은 받는 대로 파싱해 chunk_size 건씩 넘긴다: 요청 1회, 메모리에는 한 청크만
+        # 페이지 응답({"results", "next", ...})은 next 를 따라가며 페이지 단위로 넘긴다
+        # 검증자는 첫 청크에 실린다 (304 면 not_modified 청크 하나로 끝)
+        headers = {"Authorization": f"Gateway {access_token}"}
+        params = {"updated_since": updated_since} if updated_since else None
+        key, entry = self.market_validator(path, access_token, updated_since, conditional)
+        if self.http_cache is not None:
+            headers.update(self.http_cache.conditional_headers(entry))
+        validator = None
+        url = path
+        while url:
+            async with self.client.stream("GET", url, headers=headers, params=params) as response:
+                if validator is None and self.http_cache is not None:
+                    self.http_cache.record(response, entry)
+                    if response.status_code == 304 and entry is not None:
+                        yield self.not_modified()
+                        return
+                response.raise_for_status()
+                params = None  # next 링크에 쿼리가 포함되어 있음
+                headers = {"Authorization": f"Gateway {access_token}"}
+                if validator is None and key is not None:
+                    validator = CacheEntry.from_response(key, response)
+                texts = response.aiter_text()
+                head = ""
+                async for text in texts:
+                    head += text
+                    if head.strip():
+                        break
+
+                if not head.lstrip().startswith("["):
+                    body = head + "".join([text async for text in texts])
+                    delta, url = self.parse_market_data(json.loads(body), updated_since is not None)
+                    if validator is not None:
+                        validator.size += response.num_bytes_downloaded
+                    delta.validator = validator
+                    yield delta
+                    continue
+
+                if updated_since is not None:
+                    raise DeltaUnavailableError("Market data response has no delta shape")
+                chunk, chunks = [], 0
+                async for item in iter_json_array(head, texts):
+                    chunk.append(item)
+                    if len(chunk) >= chunk_size:
+                        yield MarketDataDelta(results=chunk, deleted_ids=[], server_time=None, validator=validator)
+                        chunk, chunks = [], chunks + 1
+                if validator is not None:
+                    # 같은 객체를 모든 청크가 공유하므로 마지막에 채워도 커밋 시점에는 전체 크기
+                    validator.size = response.num_bytes_downloaded
+                if chunk or chunks == 0:
+                    yield MarketDataDelta(results=chunk, deleted_ids=[], server_time=None, validator=validator)
+                url = None
 
-    async def fetch_rfid_cards(self, access_token: str) -> List[Dict[str, Any]]:
+    async def fetch_rfid_card(self, access_token: str, uid: str) -> Dict[str, Any] | None:
         headers = {"Authorization": f"Gateway {access_token}"}
-        response = await self.client.get("market/api/rfid-cards/", headers=headers)
+        response = await self.client.get("market/api/rfid-cards/", headers=headers, params={"uid": uid})
+        if response.status_code == 404:
+            return None
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        results = data["results"] if isinstance(data, dict) else data
+        return next((card for card in results if card["uid"] == uid), None)
+
+    async def fetch_species(
+        self,
+        access_token: str,
+        updated_since: str | None = None,
+        conditional: bool = False,
+    ) -> MarketDataDelta:
+        return await self.fetch_market_data("market/api/species/", access_token, updated_since, conditional)
+    
+    async def fetch_producers(
+        self,
+        access_token: str,
+        updated_since: str | None = None,
+        conditional: bool = False,
+    ) -> MarketDataDelta:
+        return await self.fetch_market_data("market/api/producers/", access_token, updated_since, conditional)
+
+    def iter_rfid_card_chunks(
+        self,
+        access_token: str,
+        updated_since: str | None = None,
+        chunk_size: int = 1000,
+        conditional: bool = False,
+    ) -> AsyncIterator[MarketDataDelta]:
+        return self.iter_market_data_chunks(
+            "market/api/rfid-cards/", access_token, updated_since, chunk_size, conditional
+        )
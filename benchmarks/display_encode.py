@@ -0,0 +1,89 @@
+# python -m benchmarks.display_encode
+import argparse
+from decimal import Decimal
+import time
+
+from suwol1000 import (
+    ETX,
+    STX,
+    DisplayRequestPacket,
+    RelayCode,
+    _display_frame_cache,
+    _encode_display_frame,
+)
+
+
+def legacy_to_bytes(packet: DisplayRequestPacket) -> bytes:
+    # 캐시 도입 전 DisplayRequestPacket.to_bytes 구현 (비교 기준)
+    display_weight_bytes = f"{packet.display_weight:=+8.6}".encode()
+    display_plate_bytes = f"{packet.display_plate[-6:]:>6}".encode()
+    relay_value = (
+        RelayCode.GREEN * packet.green_blink |
+        RelayCode.RED * packet.red_blink |
+        RelayCode.RELAY3 * False |
+        RelayCode.FAN * False |
+        RelayCode.HEATER * False |
+        RelayCode.RELAY6 * False |
+        RelayCode.RELAY7 * False |
+        RelayCode.RELAY8 * False
+    )
+    high_nibble = (relay_value & 0b11110000) >> 4
+    low_nibble  = (relay_value & 0b00001111)
+    relay_bytes = bytes([high_nibble + ord("0"), low_nibble + ord("0")])
+    return bytes([
+        STX,
+        ord(str(packet.device_id)),
+        ord(packet.command_code),
+        *display_weight_bytes,
+        *display_plate_bytes,
+        *b"000000",
+        *relay_bytes,
+        *f"{packet.voice_code:02d}".encode(),
+        *b"0000",
+        ETX,
+    ])
+
+
+def uncached_to_bytes(packet: DisplayRequestPacket) -> bytes:
+    relay_value = RelayCode.GREEN * packet.green_blink | RelayCode.RED * packet.red_blink
+    return _encode_display_frame(
+        packet.device_id,
+        packet.display_weight,
+        packet.display_plate[-6:],
+        int(relay_value),
+        int(packet.voice_code),
+    )
+
+
+def measure(name: str, encode, polls: int, weights: list[Decimal]):
+    # IDLE 경로: 매 폴링마다 워커가 새 패킷을 만들고 인코딩
+    started = time.perf_counter()
+    for i in range(polls):
+        encode(DisplayRequestPacket(display_weight=weights[i % len(weights)]))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<24} {elapsed / polls * 1e6:>6.2f} us/poll  {polls / elapsed:>12,.0f} polls/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DisplayRequestPacket idle-path encode benchmark")
+    parser.add_argument("--polls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    # 대기 중에는 저울 중량이 고정(또는 몇 개 값 사이에서 흔들림)
+    steady = [Decimal("0.0")]
+    noisy = [Decimal(f"{w / 10:.1f}") for w in range(1230, 1238)]
+
+    packet = DisplayRequestPacket(display_weight=Decimal("1234.5"), display_plate="1A2B3C4D", green_blink=True)
+    assert packet.to_bytes() == legacy_to_bytes(packet) == uncached_to_bytes(packet)
+    assert DisplayRequestPacket().to_bytes() is DisplayRequestPacket().to_bytes()
+
+    for label, weights in (("steady", steady), ("noisy", noisy)):
+        print(f"-- idle, {label} weight ({len(weights)} distinct)")
+        measure("legacy to_bytes", legacy_to_bytes, args.polls, weights)
+        measure("template (cache miss)", uncached_to_bytes, args.polls, weights)
+        measure("cached to_bytes", DisplayRequestPacket.to_bytes, args.polls, weights)
+    print(f"cached frames: {len(_display_frame_cache)}")
+
+
+if __name__ == "__main__":
+    main()
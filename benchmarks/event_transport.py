@@ -0,0 +1,117 @@
+# python -m benchmarks.event_transport --producers 40 --events 5000
+import argparse
+import asyncio
+import threading
+import time
+
+from events import WeighingCompletedEvent
+from transport import EventTransport
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class LegacyTransport:
+    # 변경 전 handle_hardware_event: 이벤트마다 call_soon_threadsafe (락 + self-pipe 쓰기 + 루프 깨움)
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.wakeups = 0
+        self.wakeup_lock = threading.Lock()
+
+    def put(self, event):
+        with self.wakeup_lock:
+            self.wakeups += 1
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (time.monotonic(), event))
+
+    async def get_batch(self, max_size: int) -> list:
+        # 변경 전 next_event_group 과 같이 첫 이벤트는 기다리고 나머지는 있는 만큼
+        batch = [await self.queue.get()]
+        while len(batch) < max_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+
+def produce(transport, barrier: threading.Barrier, events: int, burst: int, gap: float):
+    barrier.wait()
+    for i in range(events):
+        transport.put(WeighingCompletedEvent(rfid_card_uid="1A2B3C4D", weight=1234))
+        if gap and (i + 1) % burst == 0:
+            time.sleep(gap)
+
+
+async def run_round(mode: str, args) -> dict:
+    loop = asyncio.get_running_loop()
+    if mode == "legacy":
+        transport = LegacyTransport(loop)
+    else:
+        transport = EventTransport(coalesce_window=args.window / 1000 if mode == "coalesced" else 0.0)
+        transport.loop = loop
+
+    total = args.producers * args.events
+    latencies: list[float] = []
+    received = 0
+    barrier = threading.Barrier(args.producers + 1)
+    threads = [
+        threading.Thread(target=produce, args=(transport, barrier, args.events, args.burst, args.gap), daemon=True)
+        for _ in range(args.producers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    barrier.wait()
+    batches = 0
+    while received < total:
+        batch = await transport.get_batch(args.batch_size)
+        batches += 1
+        received += len(batch)
+        if mode == "legacy":
+            now = time.monotonic()
+            latencies.extend(now - enqueued_at for enqueued_at, _ in batch)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    for thread in threads:
+        thread.join()
+
+    if mode == "legacy":
+        p50, p99 = percentile(latencies, 0.50) * 1000, percentile(latencies, 0.99) * 1000
+    else:
+        stats = transport.stats()
+        p50, p99 = stats["transport_latency_p50_ms"], stats["transport_latency_p99_ms"]
+    return {
+        "events_per_s": total / elapsed,
+        "cpu_us": cpu / total * 1e6,
+        "wakeups": transport.wakeups,
+        "batches": batches,
+        "latency_p50": p50,
+        "latency_p99": p99,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Hardware thread -> event loop transport: per-event wakeup vs batched drain")
+    parser.add_argument("--producers", type=int, default=40)
+    parser.add_argument("--events", type=int, default=5000, help="events per producer thread")
+    parser.add_argument("--burst", type=int, default=50, help="events per producer between gaps")
+    parser.add_argument("--gap", type=float, default=0.0, help="producer sleep between bursts in seconds")
+    parser.add_argument("--window", type=float, default=1.0, help="coalescing window in ms")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'events/s':>10} {'cpu us/ev':>9} {'wakeups':>8} {'batches':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in ("legacy", "batched", "coalesced"):
+        row = await run_round(mode, args)
+        print(
+            f"{mode:>10} {row['events_per_s']:>10,.0f} {row['cpu_us']:>9.2f} {row['wakeups']:>8} {row['batches']:>8}"
+            f" {row['latency_p50']:>8.2f} {row['latency_p99']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+# python -m benchmarks.group_commit --stations 40 --bursts 20
+import argparse
+import asyncio
+from datetime import datetime
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import structlog
+from tortoise import Tortoise, timezone
+from tortoise.transactions import in_transaction
+
+from events import WeighingCompletedEvent
+from main import HeadlessClient
+from models import Record, UploadOutbox
+from transport import EventTransport
+
+
+async def legacy_consumer(transport: EventTransport, latencies: list[float]):
+    # 변경 전 event_consumer_worker: 이벤트마다 ORM create 2회 + 트랜잭션 1회
+    while True:
+        for event in await transport.get_batch(1):
+            async with in_transaction():
+                record = await Record.create(
+                    uuid=event.uuid,
+                    rfid_card_uid=event.rfid_card_uid,
+                    weight=event.weight,
+                    measured_at=event.timestamp,
+                )
+                await UploadOutbox.create(record=record, next_attempt_at=timezone.now())
+            latencies.append((datetime.now() - event.timestamp).total_seconds())
+
+
+def produce(client: HeadlessClient, barrier: threading.Barrier, bursts: int, gap: float):
+    # 러시 상황: 모든 계근대가 같은 순간에 계근을 마친다
+    for _ in range(bursts):
+        barrier.wait()
+        client.handle_hardware_event(WeighingCompletedEvent(rfid_card_uid="1A2B3C4D", weight=1234))
+        time.sleep(gap)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_round(mode: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        await Tortoise.init(db_url=f"sqlite://{os.path.join(directory, 'db.sqlite3')}", modules={"models": ["models"]})
+        await Tortoise.generate_schemas()
+        try:
+            client = HeadlessClient(base_url="http://localhost")
+            client.main_loop = asyncio.get_running_loop()
+            client.event_transport.loop = client.main_loop
+            client.event_transport.coalesce_window = args.window / 1000 if mode == "group" else 0.0
+            client.commit_batch_size = args.batch_size
+
+            latencies: list[float] = []
+            if mode == "legacy":
+                consumer = asyncio.create_task(legacy_consumer(client.event_transport, latencies))
+                processed = lambda: len(latencies)
+            else:
+                consumer = asyncio.create_task(client.event_consumer_worker())
+                processed = lambda: client.record_writer.records
+
+            barrier = threading.Barrier(args.stations)
+            threads = [
+                threading.Thread(target=produce, args=(client, barrier, args.bursts, args.gap), daemon=True)
+                for _ in range(args.stations)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            await asyncio.to_thread(lambda: [thread.join() for thread in threads])
+            while processed() < args.stations * args.bursts:
+                await asyncio.sleep(0.001)
+            elapsed = time.perf_counter() - started
+
+            consumer.cancel()
+            await client.api_client.close()
+            count = await Record.all().count()
+        finally:
+            await Tortoise.close_connections()
+
+    if mode == "group":
+        stats = client.record_writer.stats()
+        return {
+            "records": count,
+            "elapsed": elapsed,
+            "commits": stats["commits"],
+            "latency_p50": stats["latency_p50_ms"],
+            "latency_p99": stats["latency_p99_ms"],
+            "latency_max": stats["latency_max_ms"],
+        }
+    return {
+        "records": count,
+        "elapsed": elapsed,
+        "commits": count,
+        "latency_p50": percentile(latencies, 0.50) * 1000,
+        "latency_p99": percentile(latencies, 0.99) * 1000,
+        "latency_max": max(latencies) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Event-to-durable latency of per-event commits vs group commit")
+    parser.add_argument("--stations", type=int, default=40)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--gap", type=float, default=0.2, help="seconds between bursts")
+    parser.add_argument("--window", type=float, default=5.0, help="group commit window in ms")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'mode':>7} {'records':>8} {'commits':>8} {'avg batch':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode in ("legacy", "group"):
+        row = await run_round(mode, args)
+        print(
+            f"{mode:>7} {row['records']:>8} {row['commits']:>8} {row['records'] / row['commits']:>9.1f}"
+            f" {row['latency_p50']:>8.2f} {row['latency_p99']:>8.2f} {row['latency_max']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
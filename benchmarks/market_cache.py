@@ -0,0 +1,133 @@
+# python -m benchmarks.market_cache --cards 100000 200000
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import gc
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+import structlog
+from tortoise import Tortoise
+
+from cache import MarketDataCache, RFIDInfo, build_market_snapshot
+from models import RFIDCard
+from storage import STORAGE_PROFILES
+
+
+def populate(db_path: str, cards: int) -> list[str]:
+    now = datetime.now(timezone.utc).isoformat(sep=" ")
+    producers = max(1, cards // 10)
+    uids = [f"{key:08X}" for key in random.sample(range(2**32), cards)]
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany("INSERT INTO species (id, name) VALUES (?, ?)", [(i + 1, f"어종 {i + 1}") for i in range(50)])
+        conn.executemany(
+            "INSERT INTO producer (id, uuid, name, phone, created_at) VALUES (?, ?, ?, NULL, ?)",
+            [(i + 1, str(uuid.uuid4()), f"생산자 {i + 1}", now) for i in range(producers)],
+        )
+        conn.executemany(
+            "INSERT INTO rfid_card (id, uuid, uid, producer_id, species_id, is_active, issued_at)"
+            " VALUES (?, ?, ?, ?, ?, 1, ?)",
+            [(i + 1, str(uuid.uuid4()), uid, i % producers + 1, i % 50 + 1, now) for i, uid in enumerate(uids)],
+        )
+    conn.close()
+    return uids
+
+
+async def legacy_build() -> dict:
+    # 변경 전 refresh_market_cache: 이벤트 루프에서 ORM 으로 전부 읽어 카드마다 RFIDInfo
+    rfid_map = {}
+    for card in await RFIDCard.all().select_related("producer", "species"):
+        rfid_map[card.uid] = RFIDInfo(
+            is_active=card.is_active,
+            producer_name=card.producer.name,
+            species_name=card.species.name,
+        )
+    return rfid_map
+
+
+async def watch_loop(stalls: list[float], stop: asyncio.Event):
+    # 1ms 마다 깨어나 늦은 만큼을 루프 정지 시간으로 기록
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        stalls.append(time.perf_counter() - started - 0.001)
+
+
+async def build(mode: str, db_path: str):
+    if mode == "legacy":
+        return (await legacy_build()).get
+    cache = MarketDataCache()
+    cache.publish(await asyncio.to_thread(build_market_snapshot, db_path))
+    return cache.get_rfid_info
+
+
+async def measure(mode: str, db_path: str, uids: list[str]) -> dict:
+    # 시간은 tracemalloc 없이, 메모리는 따로 한 번 더 만들어 잰다
+    stalls: list[float] = []
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stalls, stop))
+    started = time.perf_counter()
+    lookup = await build(mode, db_path)
+    build_time = time.perf_counter() - started
+    stop.set()
+    await watcher
+
+    probes = random.sample(uids, min(len(uids), 100000))
+    started = time.perf_counter()
+    for uid in probes:
+        lookup(uid)
+    lookup_ns = (time.perf_counter() - started) / len(probes) * 1e9
+    del lookup
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    lookup = await build(mode, db_path)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del lookup
+
+    return {
+        "build_ms": build_time * 1000,
+        "stall_ms": max(stalls, default=0.0) * 1000,
+        "retained_mib": (current - baseline) / 2**20,
+        "peak_mib": (peak - baseline) / 2**20,
+        "lookup_ns": lookup_ns,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Market cache build time and memory: ORM dict vs compact snapshot")
+    parser.add_argument("--cards", type=int, nargs="+", default=[100000])
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'cards':>7} {'mode':>7} {'build ms':>9} {'max stall ms':>12} {'retained MiB':>12} {'peak MiB':>9} {'lookup ns':>9}")
+    for cards in args.cards:
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = os.path.join(directory, "db.sqlite3")
+            await Tortoise.init(config=STORAGE_PROFILES["performance"].tortoise_config(db_path))
+            await Tortoise.generate_schemas()
+            try:
+                uids = populate(db_path, cards)
+                for mode in ("legacy", "compact"):
+                    row = await measure(mode, db_path, uids)
+                    print(
+                        f"{cards:>7} {mode:>7} {row['build_ms']:>9.0f} {row['stall_ms']:>12.1f}"
+                        f" {row['retained_mib']:>12.1f} {row['peak_mib']:>9.1f} {row['lookup_ns']:>9.0f}"
+                    )
+            finally:
+                await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
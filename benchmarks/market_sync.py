@@ -0,0 +1,158 @@
+# python -m benchmarks.market_sync --cards 50000 --latency 0.3 [--trace-memory]
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+import httpx
+import structlog
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from main import HeadlessClient
+from models import Producer, RFIDCard, Species
+
+
+class StandInServer:
+    # 시세 API 대역: 요청마다 latency 만큼 지연, 카드 목록은 64 KiB 조각으로 흘려보낸다
+    # page_size 를 주면 {"results", "next"} 형식으로 페이지네이션
+    def __init__(self, cards: int, latency: float, page_size: int | None = None):
+        now = datetime.now(timezone.utc).isoformat()
+        self.latency = latency
+        self.page_size = page_size
+        self.requests = 0
+        self.species = [{"id": i + 1, "name": f"어종 {i + 1}"} for i in range(50)]
+        self.producers = [
+            {"id": i + 1, "uuid": str(uuid.uuid4()), "name": f"생산자 {i + 1}", "phone": None, "created_at": now}
+            for i in range(max(1, cards // 10))
+        ]
+        self.rfid_cards = [
+            {
+                "id": i + 1,
+                "uuid": str(uuid.uuid4()),
+                "uid": f"{i:08X}",
+                "producer": i % len(self.producers) + 1,
+                "species": i % len(self.species) + 1,
+                "is_active": True,
+                "issued_at": now,
+            }
+            for i in range(cards)
+        ]
+        self.rfid_cards_body = json.dumps(self.rfid_cards).encode()
+
+    async def stream(self, body: bytes):
+        for i in range(0, len(body), 65536):
+            yield body[i:i + 65536]
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        path = request.url.path
+        if path.endswith("/species/"):
+            return httpx.Response(200, json=self.species)
+        if path.endswith("/producers/"):
+            return httpx.Response(200, json=self.producers)
+
+        if self.page_size is None:
+            return httpx.Response(200, content=self.stream(self.rfid_cards_body))
+        offset = int(request.url.params.get("offset", 0))
+        next_url = None
+        if offset + self.page_size < len(self.rfid_cards):
+            next_url = str(request.url.copy_merge_params({"offset": offset + self.page_size}))
+        return httpx.Response(200, json={
+            "results": self.rfid_cards[offset:offset + self.page_size],
+            "next": next_url,
+            "server_time": datetime.now(timezone.utc).isoformat(),
+        })
+
+
+def rfid_card_from_api(data: dict) -> RFIDCard:
+    # 변경 전 ORM 매핑: 비교 기준 sequential_sync 에서만 쓴다
+    return RFIDCard(
+        id=data["id"],
+        uuid=data["uuid"],
+        uid=data["uid"],
+        producer_id=data["producer"],
+        species_id=data["species"],
+        is_active=data["is_active"],
+        issued_at=data["issued_at"],
+        last_used_at=data.get("last_used_at")
+    )
+
+
+async def sequential_sync(client: HeadlessClient):
+    # 변경 전 전체 재구성: 세 API 를 차례로 받아 전부 메모리에 올린 뒤 한 트랜잭션으로 교체
+    api = client.api_client
+    headers = {"Authorization": f"Gateway {client.access_token}"}
+    species = (await api.client.get("market/api/species/", headers=headers)).json()
+    producers = (await api.client.get("market/api/producers/", headers=headers)).json()
+    rfid_cards = (await api.client.get("market/api/rfid-cards/", headers=headers)).json()
+
+    async with in_transaction():
+        await RFIDCard.all().delete()
+        await Producer.all().delete()
+        await Species.all().delete()
+        await Species.bulk_create([Species(**s) for s in species])
+        await Producer.bulk_create([Producer(**p) for p in producers])
+        await RFIDCard.bulk_create([rfid_card_from_api(data) for data in rfid_cards])
+
+
+async def run_round(mode: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        await Tortoise.init(db_url=f"sqlite://{os.path.join(directory, 'db.sqlite3')}", modules={"models": ["models"]})
+        await Tortoise.generate_schemas()
+        try:
+            server = StandInServer(args.cards, args.latency, args.page_size)
+            client = HeadlessClient(base_url="http://stand-in")
+            await client.api_client.client.aclose()
+            client.api_client.client = httpx.AsyncClient(
+                base_url="http://stand-in/", transport=httpx.MockTransport(server.handle)
+            )
+            client.access_token = "benchmark"
+            client.gateway_id = 1
+
+            if args.trace_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            if mode == "sequential":
+                await sequential_sync(client)
+            else:
+                await client.stream_market_data(None)
+            elapsed = time.perf_counter() - started
+            peak = 0
+            if args.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+            cards = await RFIDCard.all().count()
+            await client.api_client.close()
+        finally:
+            await Tortoise.close_connections()
+
+    return {"elapsed": elapsed, "peak_mib": peak / 2**20, "cards": cards, "requests": server.requests}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Full market data sync: sequential load vs concurrent paged streaming")
+    parser.add_argument("--cards", type=int, default=50000)
+    parser.add_argument("--latency", type=float, default=0.3, help="server round trip in seconds")
+    parser.add_argument("--page-size", type=int, help="stand-in paginates card list instead of streaming it")
+    parser.add_argument("--trace-memory", action="store_true", help="report tracemalloc peak (slows both modes)")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'mode':>10} {'cards':>7} {'requests':>9} {'elapsed s':>10} {'peak MiB':>9}")
+    for mode in ("streaming",) if args.page_size else ("sequential", "streaming"):
+        row = await run_round(mode, args)
+        print(f"{mode:>10} {row['cards']:>7} {row['requests']:>9} {row['elapsed']:>10.2f} {row['peak_mib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
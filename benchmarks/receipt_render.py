@@ -0,0 +1,122 @@
+# python -m benchmarks.receipt_render
+import argparse
+from datetime import datetime, timedelta
+from decimal import Decimal
+import random
+import time
+import uuid
+
+from printer import Alignment, EscPosBuilder, Receipt, ReceiptTemplate
+
+
+def legacy_render(receipt: Receipt) -> bytes:
+    # 컴파일 도입 전 ReceiptTemplate.render 구현 (비교 기준): 전표마다 빌더 체인 전체를 다시 실행
+    short_uuid = str(receipt.record_uuid).split("-")[0].upper()
+
+    def add_kv(builder: EscPosBuilder, key: str, value: str, max_col: int = 42) -> EscPosBuilder:
+        k_bytes = len(key.encode("cp949", errors="replace"))
+        v_bytes = len(value.encode("cp949", errors="replace"))
+        spaces = max(1, max_col - k_bytes - v_bytes)
+        return builder.add_text(f"{key}{' ' * spaces}{value}").feed_lines(1)
+
+    builder = (
+        EscPosBuilder()
+        .set_align(Alignment.CENTER)
+        .set_quadruple(True)
+        .set_bold(True)
+        .add_text("계 량 전 표")
+        .set_quadruple(False)
+        .set_bold(False)
+        .feed_lines(2)
+        .set_align(Alignment.LEFT)
+        .add_separator("=", 42)
+    )
+    add_kv(builder, "발행일시", receipt.measured_at.strftime("%Y-%m-%d %H:%M:%S"))
+    add_kv(builder, "전표번호", short_uuid)
+    add_kv(builder, "계 량 기", receipt.gateway_name)
+    add_kv(builder, "계 근 대", receipt.station_name)
+    builder.add_separator("-", 42)
+    add_kv(builder, "생산자명", receipt.producer_name)
+    add_kv(builder, "품 목 명", receipt.species_name)
+    add_kv(builder, "카드번호", receipt.rfid_card_uid)
+    (
+        builder
+        .set_align(Alignment.RIGHT)
+        .set_quadruple(True)
+        .set_bold(True)
+        .add_text(f"{receipt.weight:,} kg")
+        .feed_lines(1)
+        .set_quadruple(False)
+        .set_bold(False)
+        .set_align(Alignment.CENTER)
+        .add_separator("=", 42)
+        .add_text("SUWOL ScaleLedger System")
+        .cut()
+    )
+    return builder.build()
+
+
+def make_receipts(count: int, producers: int) -> list[Receipt]:
+    rng = random.Random(0)
+    started = datetime(2026, 5, 1, 5, 0, 0)
+    return [
+        Receipt(
+            record_uuid=uuid.uuid4(),
+            gateway_name="수월 위판장",
+            station_name=f"{i % 8 + 1}번 계근대",
+            rfid_card_uid=f"{rng.getrandbits(32):08X}",
+            producer_name=f"생산자 {rng.randrange(producers)}",
+            species_name=rng.choice(["고등어", "갈치", "오징어", "삼치", "전갱이"]),
+            weight=Decimal(rng.randrange(100, 30000)),
+            measured_at=started + timedelta(seconds=i * 7),
+        )
+        for i in range(count)
+    ]
+
+
+def measure(name: str, render, receipts: list[Receipt]):
+    started = time.perf_counter()
+    for receipt in receipts:
+        render(receipt)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed / len(receipts) * 1e6:>7.2f} us/receipt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receipt render time: builder chain vs compiled template vs render-ahead")
+    parser.add_argument("--receipts", type=int, default=50_000)
+    parser.add_argument("--producers", type=int, default=500, help="distinct producer names (cp949 encode cache)")
+    args = parser.parse_args()
+
+    receipts = make_receipts(args.receipts, args.producers)
+    for receipt in receipts[:1000]:
+        assert ReceiptTemplate.render(receipt) == legacy_render(receipt)
+
+    def render_ahead(receipt: Receipt):
+        # VERIFY 통과 직후 (계량 중): 카드 정보까지 굳혀 둔다
+        return ReceiptTemplate.compile(receipt.gateway_name, receipt.station_name).bind(
+            producer_name=receipt.producer_name,
+            species_name=receipt.species_name,
+            rfid_card_uid=receipt.rfid_card_uid,
+        )
+
+    prepared = [render_ahead(receipt) for receipt in receipts]
+    for receipt, template in zip(receipts[:1000], prepared):
+        assert template.render(
+            measured_at=receipt.measured_at, record_uuid=receipt.record_uuid, weight=receipt.weight
+        ) == legacy_render(receipt)
+
+    def print_state(pair):
+        # PRINT 상태에서 남는 일: 계량 결과(시각, 전표번호, 중량)만 채운다
+        receipt, template = pair
+        return template.render(measured_at=receipt.measured_at, record_uuid=receipt.record_uuid, weight=receipt.weight)
+
+    print(f"-- {args.receipts} receipts, {args.producers} producers, {len(legacy_render(receipts[0]))} bytes each")
+    measure("legacy builder chain", legacy_render, receipts)
+    measure("compiled render", ReceiptTemplate.render, receipts)
+    measure("render-ahead (in VERIFY)", render_ahead, receipts)
+    measure("render-ahead fill (in PRINT)", print_state, list(zip(receipts, prepared)))
+
+
+if __name__ == "__main__":
+    main()
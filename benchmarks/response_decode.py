@@ -0,0 +1,132 @@
+# python -m benchmarks.response_decode
+import argparse
+import itertools
+import random
+import sys
+import time
+import tracemalloc
+
+from suwol1000 import (
+    ETX,
+    STX,
+    InputCode,
+    PrinterStatus,
+    ResponseFrame,
+    ResponsePacket,
+    VoiceCode,
+    WeightStatus,
+    WeightType,
+)
+
+
+def build_frame(
+    rfid_card_uid: str = "00000000",
+    user_command_code: InputCode = InputCode.NONE,
+    relay_value: int = 0,
+    voice_code: VoiceCode = VoiceCode.NONE,
+    printer_status: PrinterStatus = PrinterStatus.NORMAL,
+    weight_status: WeightStatus = WeightStatus.STABLE,
+    weight_type: WeightType = WeightType.NET,
+    weight: str = "+ 1234.5",
+) -> bytes:
+    relay = chr((relay_value >> 4) + 0x30) + chr((relay_value & 0x0F) + 0x30)
+    body = (
+        f"0D{rfid_card_uid}{user_command_code}000000{relay}00{voice_code:02d}"
+        f"0253005{printer_status.value}0000{weight_status},{weight_type},{weight}kg"
+    )
+    return bytes([STX, *body.encode(), ETX])
+
+
+def sample_frames() -> list[bytes]:
+    rng = random.Random(1000)
+    weights = ["+    0.0", "-    0.0", "+ 1234.5", "-   12.3", "+12345.6", "+  123.0", "+0001234", "+     .5"]
+    frames = []
+    for voice_code, printer_status, weight_status, weight_type in itertools.product(
+        VoiceCode, PrinterStatus, WeightStatus, WeightType
+    ):
+        frames.append(build_frame(
+            rfid_card_uid=rng.choice(["00000000", "1A2B3C4D", "00FF00FF"]),
+            user_command_code=rng.choice(list(InputCode)),
+            relay_value=rng.randrange(256),
+            voice_code=voice_code,
+            printer_status=printer_status,
+            weight_status=weight_status,
+            weight_type=weight_type,
+            weight=rng.choice(weights),
+        ))
+    return frames
+
+
+def check_equivalence(frames: list[bytes]):
+    for raw in frames:
+        expected = ResponsePacket.from_bytes(raw)
+        actual = ResponseFrame.from_bytes(raw).to_packet()
+        assert actual == expected, (raw, expected, actual)
+        assert str(actual.weight_value) == str(expected.weight_value), raw
+        frame = ResponseFrame.from_bytes(memoryview(raw))
+        assert frame.weight_fixed == int(expected.weight_value.scaleb(frame.weight_decimals)), raw
+
+
+def poll_eager(raw: bytes):
+    response = ResponsePacket.from_bytes(raw)
+    return response.weight_value, response.voice_code, response.rfid_card_uid != "00000000"
+
+
+def poll_lazy(raw: bytes):
+    response = ResponseFrame.from_bytes(raw)
+    return response.weight_value, response.voice_code, response.has_rfid_card
+
+
+def full_lazy(raw: bytes):
+    return ResponseFrame.from_bytes(raw).to_packet()
+
+
+def measure(name: str, decode, frames: list[bytes], iterations: int):
+    stream = list(itertools.islice(itertools.cycle(frames), iterations))
+
+    started = time.perf_counter()
+    for raw in stream:
+        decode(raw)
+    elapsed = time.perf_counter() - started
+
+    held = []
+    blocks_before = sys.getallocatedblocks()
+    for raw in stream[:10_000]:
+        held.append(decode(raw))
+    retained = (sys.getallocatedblocks() - blocks_before) / len(held)
+    del held
+
+    tracemalloc.start()
+    peaks = []
+    for raw in frames:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        decode(raw)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - baseline)
+    tracemalloc.stop()
+
+    print(
+        f"{name:<28} {iterations / elapsed:>12,.0f} frames/s"
+        f"  {elapsed / iterations * 1e6:>6.2f} us/frame"
+        f"  {retained:>5.1f} blocks/frame"
+        f"  {sum(peaks) / len(peaks):>7.0f} peak B/frame"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SUWOL-1000 response decoder micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    frames = sample_frames()
+    check_equivalence(frames)
+    print(f"equivalence: {len(frames)} frames OK")
+
+    measure("ResponsePacket (poll)", poll_eager, frames, args.iterations)
+    measure("ResponseFrame (poll)", poll_lazy, frames, args.iterations)
+    measure("ResponseFrame.to_packet", full_lazy, frames, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# python -m benchmarks.station_load --stations 1 5 10 20 40
+import argparse
+import logging
+import multiprocessing
+import resource
+import statistics
+import time
+from types import SimpleNamespace
+
+import structlog
+
+from cache import MarketDataCache, MarketSnapshot
+from emulator import EmulatorHub, EmulatorScript, SuwolEmulator
+
+
+RFID_CARD_UID = "1A2B3C4D"
+
+
+def run_emulators(count: int, period: float, noise: float, conn):
+    hub = EmulatorHub()
+    emulators = [SuwolEmulator(EmulatorScript.truck_cycle(RFID_CARD_UID, period=period), noise=noise, seed=i) for i in range(count)]
+    ports = [hub.add(emulator) for emulator in emulators]
+    hub.start()
+    conn.send(ports)
+
+    conn.recv()
+    hub.stop()
+    conn.send([
+        {
+            "request_times": emulator.request_times.tolist(),
+            "print_jobs": emulator.print_jobs,
+        }
+        for emulator in emulators
+    ])
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def context_switches() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
+
+
+def rss_mib() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_round(count: int, args) -> dict:
+    from managers import WeighingStationManager
+
+    conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=run_emulators, args=(count, args.period, args.noise, child_conn), daemon=True)
+    process.start()
+    ports = conn.recv()
+
+    events = []
+    snapshot = MarketSnapshot()
+    snapshot.upsert_producer(1, "수월수산")
+    snapshot.upsert_species(1, "광어")
+    snapshot.upsert_card(RFID_CARD_UID, is_active=True, producer_id=1, species_id=1)
+    market_cache = MarketDataCache()
+    market_cache.publish(snapshot)
+    manager = WeighingStationManager(
+        on_event=events.append,
+        market_cache=market_cache,
+        engine=args.engine,
+        engine_threads=args.engine_threads,
+    )
+    stations = [
+        SimpleNamespace(id=i + 1, name=f"계근대 {i + 1}", serial_port=port)
+        for i, port in enumerate(ports)
+    ]
+    manager.sync(stations)
+
+    time.sleep(args.warmup)
+    window_start = time.monotonic()
+    cpu_start = cpu_seconds()
+    switches_start = context_switches()
+    time.sleep(args.duration)
+    cpu_used = cpu_seconds() - cpu_start
+    switches = context_switches() - switches_start
+    window_end = time.monotonic()
+    rss = rss_mib()
+    station_stats = manager.station_stats()
+
+    manager.stop_all()
+    conn.send("stop")
+    results = conn.recv()
+    process.join(timeout=5.0)
+
+    poll_rates, intervals = [], []
+    for result in results:
+        times = [t for t in result["request_times"] if window_start <= t <= window_end]
+        poll_rates.append(len(times) / (window_end - window_start))
+        intervals.extend(b - a for a, b in zip(times, times[1:]))
+
+    return {
+        "stations": count,
+        "poll_rate": statistics.mean(poll_rates),
+        "interval_p50": percentile(intervals, 0.50) * 1000,
+        "interval_p99": percentile(intervals, 0.99) * 1000,
+        "jitter": (statistics.pstdev(intervals) if intervals else float("nan")) * 1000,
+        "cpu_per_station": cpu_used / (window_end - window_start) / count * 1000,
+        "context_switches": switches / (window_end - window_start),
+        "rss": rss,
+        "overruns": sum(stats["overruns"] for stats in station_stats.values()),
+        "events": len(events),
+        "print_jobs": sum(result["print_jobs"] for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-station load benchmark against emulated SUWOL-1000 scales")
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 5, 10, 20, 40])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--period", type=float, default=15.0, help="emulated truck cycle in seconds")
+    parser.add_argument("--noise", type=float, default=0.0, help="probability of a stray byte per response")
+    parser.add_argument("--engine", choices=["thread", "multiplexed"], nargs="+", default=["thread"])
+    parser.add_argument("--engine-threads", type=int, default=1)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(
+        f"{'engine':>11} {'stations':>8} {'polls/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'jitter ms':>9}"
+        f" {'cpu ms/s':>9} {'csw/s':>8} {'rss MiB':>8} {'overruns':>8} {'events':>7} {'prints':>7}"
+    )
+    engines = args.engine
+    for engine in engines:
+        args.engine = engine
+        for count in args.stations:
+            row = run_round(count, args)
+            print(
+                f"{engine:>11} {row['stations']:>8} {row['poll_rate']:>8.2f} {row['interval_p50']:>8.1f}"
+                f" {row['interval_p99']:>8.1f} {row['jitter']:>9.1f} {row['cpu_per_station']:>9.2f}"
+                f" {row['context_switches']:>8.0f} {row['rss']:>8.1f} {row['overruns']:>8} {row['events']:>7} {row['print_jobs']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# python -m benchmarks.storage_profile --records 2000 --cards 20000
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+import structlog
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from events import WeighingCompletedEvent
+from models import Producer, Record, RFIDCard, Species
+from storage import STORAGE_PROFILES
+from workers import RecordWriter
+
+
+def market_data(cards: int) -> tuple[list[dict], list[dict], list[dict]]:
+    now = datetime.now(timezone.utc)
+    species = [{"id": i + 1, "name": f"어종 {i + 1}"} for i in range(50)]
+    producers = [
+        {"id": i + 1, "uuid": uuid.uuid4(), "name": f"생산자 {i + 1}", "phone": None, "created_at": now}
+        for i in range(max(1, cards // 10))
+    ]
+    rfid_cards = [
+        {
+            "id": i + 1,
+            "uuid": uuid.uuid4(),
+            "uid": f"{i:08X}",
+            "producer_id": i % len(producers) + 1,
+            "species_id": i % len(species) + 1,
+            "is_active": True,
+            "issued_at": now,
+        }
+        for i in range(cards)
+    ]
+    return species, producers, rfid_cards
+
+
+async def replace_market_data(species: list[dict], producers: list[dict], rfid_cards: list[dict]):
+    # HeadlessClient.sync_market_data 와 같은 전체 교체
+    async with in_transaction():
+        await RFIDCard.all().delete()
+        await Producer.all().delete()
+        await Species.all().delete()
+        await Species.bulk_create([Species(**data) for data in species])
+        await Producer.bulk_create([Producer(**data) for data in producers])
+        await RFIDCard.bulk_create([RFIDCard(**data) for data in rfid_cards])
+
+
+async def run_profile(name: str, args) -> dict:
+    profile = STORAGE_PROFILES[name]
+    with tempfile.TemporaryDirectory() as directory:
+        await Tortoise.init(config=profile.tortoise_config(os.path.join(directory, "db.sqlite3")))
+        await Tortoise.generate_schemas()
+        try:
+            writer = RecordWriter()
+            events = [WeighingCompletedEvent(rfid_card_uid="1A2B3C4D", weight=1234) for _ in range(args.records)]
+
+            # 계근 1건 = 트랜잭션 1회 (한산한 시간대의 event_consumer_worker)
+            started = time.perf_counter()
+            for event in events:
+                await writer.write([event])
+            insert_rate = len(events) / (time.perf_counter() - started)
+
+            # 업로드 성공분 purge: 배치 100건씩 DELETE
+            started = time.perf_counter()
+            for i in range(0, len(events), 100):
+                await Record.filter(uuid__in=[event.uuid for event in events[i:i + 100]]).delete()
+            delete_rate = len(events) / (time.perf_counter() - started)
+
+            data = market_data(args.cards)
+            replace_times = []
+            for _ in range(args.replaces):
+                started = time.perf_counter()
+                await replace_market_data(*data)
+                replace_times.append(time.perf_counter() - started)
+        finally:
+            await Tortoise.close_connections()
+
+    return {
+        "insert_rate": insert_rate,
+        "delete_rate": delete_rate,
+        "replace_ms": min(replace_times) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Local SQLite throughput under each storage profile")
+    parser.add_argument("--profiles", nargs="+", choices=list(STORAGE_PROFILES), default=list(STORAGE_PROFILES))
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--cards", type=int, default=20000)
+    parser.add_argument("--replaces", type=int, default=3)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'profile':>15} {'insert/s':>10} {'delete/s':>10} {'replace ms':>11}")
+    for name in args.profiles:
+        row = await run_profile(name, args)
+        print(f"{name:>15} {row['insert_rate']:>10.0f} {row['delete_rate']:>10.0f} {row['replace_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
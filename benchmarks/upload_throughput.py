@@ -0,0 +1,117 @@
+# python -m benchmarks.upload_throughput --records 200 --latency 0.3 --concurrency 1 4 8
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+import httpx
+import structlog
+from tortoise import Tortoise, timezone
+
+from api import APIClient
+from models import OutboxStatus, Record, UploadOutbox
+from workers import RecordUploadWorker
+
+
+class StandInServer:
+    # 업로드 API 대역: 요청마다 latency 만큼 지연 후 응답, 동시 처리 수 기록
+    def __init__(self, latency: float, batch_supported: bool):
+        self.latency = latency
+        self.batch_supported = batch_supported
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            if request.url.path.endswith("/batch/"):
+                if not self.batch_supported:
+                    return httpx.Response(404)
+                records = json.loads(request.content)["records"]
+                return httpx.Response(200, json={
+                    "results": [{"uuid": record["uuid"], "status": 201} for record in records],
+                })
+            return httpx.Response(201, json=json.loads(request.content))
+        finally:
+            self.active -= 1
+
+
+async def run_round(args, concurrency: int, batch_size: int, batch_supported: bool) -> dict:
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["models"]})
+    await Tortoise.generate_schemas()
+
+    try:
+        measured_at = timezone.now()
+        records = [
+            Record(uuid=uuid.uuid4(), rfid_card_uid="1A2B3C4D", weight=1234, measured_at=measured_at)
+            for _ in range(args.records)
+        ]
+        await Record.bulk_create(records)
+        await UploadOutbox.bulk_create([UploadOutbox(record_id=record.uuid, next_attempt_at=measured_at) for record in records])
+
+        server = StandInServer(args.latency, batch_supported)
+        api_client = APIClient(base_url="http://stand-in/")
+        await api_client.client.aclose()
+        api_client.client = httpx.AsyncClient(base_url="http://stand-in/", transport=httpx.MockTransport(server.handle))
+
+        worker = RecordUploadWorker(
+            api_client=api_client,
+            upload_wakeup=asyncio.Event(),
+            access_token="benchmark",
+            batch_size=batch_size,
+            concurrency=concurrency,
+        )
+        started = time.perf_counter()
+        task = asyncio.create_task(worker.run())
+        while await UploadOutbox.filter(status__in=[OutboxStatus.PENDING, OutboxStatus.IN_FLIGHT]).exists():
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+        remaining = await Record.all().count()
+        await api_client.close()
+    finally:
+        await Tortoise.close_connections()
+
+    return {
+        "rate": args.records / elapsed,
+        "elapsed": elapsed,
+        "requests": server.requests,
+        "max_active": server.max_active,
+        "remaining": remaining,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Record upload throughput against a latency-injecting stand-in server")
+    parser.add_argument("--records", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="server round trip in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--no-batch-endpoint", action="store_true", help="stand-in answers 404 on the batch endpoint")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'concurrency':>11} {'batch':>6} {'records/s':>10} {'elapsed s':>10} {'requests':>9} {'max active':>10} {'left':>5}")
+    for batch_size in args.batch_size:
+        for concurrency in args.concurrency:
+            row = await run_round(args, concurrency, batch_size, not args.no_batch_endpoint)
+            print(
+                f"{concurrency:>11} {batch_size:>6} {row['rate']:>10.1f} {row['elapsed']:>10.2f}"
+                f" {row['requests']:>9} {row['max_active']:>10} {row['remaining']:>5}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,9 @@
 # cache.py
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import Dict, Optional
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional
 
 
 @dataclass
@@ -10,13 +13,181 @@ class RFIDInfo:
     species_name: str
 
 
+HEX_DIGITS = "0123456789ABCDEF"
+
+
+def uid_key(uid: str) -> int | None:
+    # SUWOL-1000 이 읽는 8자리 대문자 16진 uid 는 4바이트 정수로 보관
+    if len(uid) == 8 and not uid.strip(HEX_DIGITS):
+        return int(uid, 16)
+    return None
+
+
+class MarketSnapshot:
+    # 카드 한 장 = 정렬된 uid 키 4바이트 + 활성 플래그 1바이트 + 이름 슬롯 4+4바이트 (행 번호 = 키 위치)
+    # 생산자/어종마다 이름 슬롯 하나, 같은 이름 문자열은 한 객체를 공유한다
+    # 웹소켓으로 들어온 변경은 patches 에 덮어써 O(1) 로 반영하고 다음 재구성 때 배열에 합쳐진다
+    __slots__ = (
+        "keys", "extra", "active", "producers", "species",
+        "producer_names", "species_names", "producer_slots", "species_slots", "patches",
+    )
+
+    def __init__(self):
+        self.keys = array("I")
+        self.extra: Dict[str, tuple[bool, int, int]] = {}    # 규격 밖 uid 는 드물어 따로 보관
+        self.active = bytearray()
+        self.producers = array("I")
+        self.species = array("I")
+        self.producer_names: List[str | None] = []    # None = 삭제됨, 가리키던 카드도 없는 것으로 본다
+        self.species_names: List[str | None] = []
+        self.producer_slots: Dict[int, int] = {}    # 생산자 id -> 이름 슬롯
+        self.species_slots: Dict[int, int] = {}
+        self.patches: Dict[str, tuple[bool, int, int] | None] = {}    # None = 삭제된 카드
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.extra)
+
+    def append(self, uid: str, is_active: bool, producer: int, species: int):
+        # uid 오름차순으로 넣어야 한다
+        key = uid_key(uid)
+        if key is None or (self.keys and key <= self.keys[-1]):
+            self.extra[uid] = (bool(is_active), producer, species)
+            return
+        self.keys.append(key)
+        self.active.append(1 if is_active else 0)
+        self.producers.append(producer)
+        self.species.append(species)
+
+    def lookup(self, uid: str) -> tuple[bool, int, int] | None:
+        if self.patches and uid in self.patches:
+            return self.patches[uid]
+        key = uid_key(uid)
+        if key is not None:
+            i = bisect_left(self.keys, key)
+            if i < len(self.keys) and self.keys[i] == key:
+                return bool(self.active[i]), self.producers[i], self.species[i]
+        return self.extra.get(uid)
+
+    def info(self, uid: str) -> Optional[RFIDInfo]:
+        found = self.lookup(uid)
+        if found is None:
+            return None
+        is_active, producer, species = found
+        producer_name, species_name = self.producer_names[producer], self.species_names[species]
+        if producer_name is None or species_name is None:
+            return None
+        return RFIDInfo(is_active=is_active, producer_name=producer_name, species_name=species_name)
+
+    def upsert_card(self, uid: str, is_active: bool, producer_id: int, species_id: int) -> bool:
+        producer = self.producer_slots.get(producer_id)
+        species = self.species_slots.get(species_id)
+        if producer is None or species is None:
+            # 부모를 모르면 DB 에도 없는 카드다: 예전 항목이 남아 있지 않게 지운다
+            self.patches[uid] = None
+            return False
+        self.patches[uid] = (bool(is_active), producer, species)
+        return True
+
+    def delete_card(self, uid: str):
+        self.patches[uid] = None
+
+    def upsert_producer(self, producer_id: int, name: str):
+        set_name(self.producer_slots, self.producer_names, producer_id, name)
+
+    def delete_producer(self, producer_id: int):
+        slot = self.producer_slots.get(producer_id)
+        if slot is not None:
+            self.producer_names[slot] = None
+            self.drop_cards(self.producers, 1, slot)
+
+    def upsert_species(self, species_id: int, name: str):
+        set_name(self.species_slots, self.species_names, species_id, name)
+
+    def delete_species(self, species_id: int):
+        slot = self.species_slots.get(species_id)
+        if slot is not None:
+            self.species_names[slot] = None
+            self.drop_cards(self.species, 2, slot)
+
+    def drop_cards(self, slots: array, field: int, slot: int):
+        # DB 는 FK CASCADE 로 카드를 지운다: 같은 id 가 다시 들어와 슬롯이 살아나도 카드가 되살아나지 않게 묘비를 남긴다
+        # 배열/extra 의 값은 patches 가 덮어썼을 수 있으니 patches 에 없는 카드만 보고, patches 는 현재 값으로 따로 본다
+        patches = self.patches
+        dropped = [
+            uid for uid, card in patches.items()
+            if card is not None and card[field] == slot
+        ]
+        for i, card_slot in enumerate(slots):
+            if card_slot == slot:
+                uid = f"{self.keys[i]:08X}"
+                if uid not in patches:
+                    dropped.append(uid)
+        for uid, card in self.extra.items():
+            if card[field] == slot and uid not in patches:
+                dropped.append(uid)
+        for uid in dropped:
+            patches[uid] = None
+
+
+def set_name(slots: Dict[int, int], names: List[str | None], row_id: int, name: str):
+    slot = slots.get(row_id)
+    if slot is None:
+        slots[row_id] = len(names)
+        names.append(name)
+    else:
+        names[slot] = name
+
+
+def build_market_snapshot(db_path: str) -> MarketSnapshot:
+    # 이벤트 루프를 막지 않도록 워커 스레드에서 ORM 없이 읽는다 (WAL 이라 쓰기와 동시에 읽어도 된다)
+    snapshot = MarketSnapshot()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        load_names(conn, "SELECT id, name FROM producer", snapshot.producer_slots, snapshot.producer_names)
+        load_names(conn, "SELECT id, name FROM species", snapshot.species_slots, snapshot.species_names)
+        producers, species = snapshot.producer_slots, snapshot.species_slots
+        # 8자리 대문자 16진 uid 는 문자열 순서와 정수 순서가 같아 정렬된 채로 append 된다
+        for uid, is_active, producer_id, species_id in conn.execute(
+            "SELECT uid, is_active, producer_id, species_id FROM rfid_card ORDER BY uid"
+        ):
+            snapshot.append(uid, is_active, producers[producer_id], species[species_id])
+    finally:
+        conn.close()
+    return snapshot
+
+
+def load_names(conn: sqlite3.Connection, query: str, slots: Dict[int, int], names: List[str | None]):
+    # 동명이인은 문자열 객체 하나를 공유 (슬롯은 id 마다 따로 두어 이름 변경이 서로 번지지 않게)
+    shared: Dict[str, str] = {}
+    for row_id, name in conn.execute(query):
+        slots[row_id] = len(names)
+        names.append(shared.setdefault(name, name))
+
+
 class MarketDataCache:
     def __init__(self):
-        self.rfid_map: Dict[str, RFIDInfo] = {}
+        self.snapshot = MarketSnapshot()
         self.gateway_name: str = "Gateway"
+        # 스냅샷을 만드는 동안 들어온 변경: 새 스냅샷에 다시 적용한 뒤 교체
+        self.pending_patches: List[Callable[[MarketSnapshot], Any]] | None = None
+
+    def begin_rebuild(self):
+        self.pending_patches = []
+
+    def cancel_rebuild(self):
+        self.pending_patches = None
+
+    def publish(self, snapshot: MarketSnapshot):
+        for patch in self.pending_patches or ():
+            patch(snapshot)
+        self.pending_patches = None
+        # 속성 하나의 교체라 계근대 스레드는 이전 또는 새 스냅샷 중 하나만 본다
+        self.snapshot = snapshot
 
-    def update_rfid_data(self, data: Dict[str, RFIDInfo]):
-        self.rfid_map = data
+    def patch(self, patch: Callable[[MarketSnapshot], Any]) -> Any:
+        if self.pending_patches is not None:
+            self.pending_patches.append(patch)
+        return patch(self.snapshot)
 
     def get_rfid_info(self, uid: str) -> Optional[RFIDInfo]:
-        return self.rfid_map.get(uid)
+        return self.snapshot.info(uid)
@@ -0,0 +1,338 @@
+# emulator.py
+from array import array
+from dataclasses import dataclass, field
+import heapq
+import os
+import random
+import selectors
+import threading
+import time
+import tty
+
+from structlog.stdlib import get_logger
+
+from suwol1000 import (
+    ETX,
+    STX,
+    CommandCode,
+    InputCode,
+    PrinterStatus,
+    VoiceCode,
+    WeightStatus,
+    WeightType,
+)
+
+
+BAUDRATE = 9600
+BYTE_TIME = 10 / BAUDRATE  # 8N1: start + data 8 + stop
+TURNAROUND = 0.002         # MCU 응답 처리 지연
+
+DISPLAY_REQUEST_LENGTH = 32
+TEMPERATURE_REQUEST_LENGTH = 8
+PRINTER_HEADER_LENGTH = 8  # STX, ID, CMD, 전송크기(4), 수량(1)
+
+INPUT_LIFETIME = 3.0  # 사양서 3.2: 입력값은 1회 수신 또는 3초 경과 시 소멸
+
+
+@dataclass(frozen=True)
+class WeightRamp:
+    at: float
+    target: float
+    duration: float = 0.0
+    settle: float = 0.5  # 목표 중량 도달 후 불안정(US) 유지 시간
+
+
+@dataclass(frozen=True)
+class RFIDTag:
+    at: float
+    uid: str
+
+
+@dataclass(frozen=True)
+class KeyInput:
+    at: float
+    code: InputCode
+    value: str
+
+
+@dataclass(frozen=True)
+class PaperOut:
+    at: float
+    until: float
+
+
+@dataclass
+class EmulatorScript:
+    weights: list[WeightRamp] = field(default_factory=list)
+    tags: list[RFIDTag] = field(default_factory=list)
+    keys: list[KeyInput] = field(default_factory=list)
+    paper_outs: list[PaperOut] = field(default_factory=list)
+    voice_durations: dict[VoiceCode, float] = field(default_factory=dict)
+    default_voice_duration: float = 1.5
+    print_duration: float = 2.0
+    period: float | None = None  # 지정 시 스크립트를 주기적으로 반복
+
+    @classmethod
+    def truck_cycle(cls, rfid_card_uid: str, weight: float = 1234.5, period: float = 15.0) -> "EmulatorScript":
+        return cls(
+            weights=[
+                WeightRamp(at=1.0, target=weight, duration=1.5),
+                WeightRamp(at=period - 3.0, target=0.0, duration=1.0),
+            ],
+            tags=[RFIDTag(at=3.5, uid=rfid_card_uid)],
+            period=period,
+        )
+
+
+class SuwolEmulator:
+    def __init__(self, script: EmulatorScript | None = None, noise: float = 0.0, seed: int | None = None):
+        self.script = script or EmulatorScript()
+        self.ramps = sorted(self.script.weights, key=lambda ramp: ramp.at)
+        self.noise = noise
+        self.random = random.Random(seed)
+
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.port = os.ttyname(self.slave_fd)
+
+        self.started_at = time.monotonic()
+        self.buffer = bytearray()
+        self.delivered: set[tuple[int, int, str]] = set()
+
+        self.relay_value = 0
+        self.voice_code = VoiceCode.NONE
+        self.voice_until = 0.0
+        self.printing_until = 0.0
+        self.fan_trigger_temp = 30
+        self.heater_trigger_temp = 5
+
+        self.request_times = array("d")
+        self.print_jobs = 0
+        self.dropped_bytes = 0
+
+    def close(self):
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def script_time(self, now: float) -> tuple[int, float]:
+        elapsed = now - self.started_at
+        if self.script.period:
+            return int(elapsed // self.script.period), elapsed % self.script.period
+        return 0, elapsed
+
+    def feed(self, data: bytes, now: float) -> list[tuple[float, bytes]]:
+        self.buffer.extend(data)
+        replies = []
+        while self.buffer:
+            start = self.buffer.find(STX)
+            if start < 0:
+                self.dropped_bytes += len(self.buffer)
+                self.buffer.clear()
+                break
+            if start > 0:
+                self.dropped_bytes += start
+                del self.buffer[:start]
+
+            length = self.request_length()
+            if length is None or len(self.buffer) < length:
+                break
+
+            if self.buffer[length - 1] != ETX:
+                self.dropped_bytes += 1
+                del self.buffer[:1]
+                continue
+
+            request = bytes(self.buffer[:length])
+            del self.buffer[:length]
+
+            response = self.handle(request, now)
+            due = now + (length + len(response)) * BYTE_TIME + TURNAROUND
+            replies.append((due, self.inject_noise(response)))
+        return replies
+
+    def request_length(self) -> int | None:
+        if len(self.buffer) < 3:
+            return None
+        match chr(self.buffer[2]):
+            case CommandCode.DISPLAY:
+                return DISPLAY_REQUEST_LENGTH
+            case CommandCode.TEMPERATURE:
+                return TEMPERATURE_REQUEST_LENGTH
+            case CommandCode.PRINTER:
+                if len(self.buffer) < PRINTER_HEADER_LENGTH:
+                    return None
+                try:
+                    return PRINTER_HEADER_LENGTH + int(self.buffer[3:7]) + 1
+                except ValueError:
+                    return 1
+            case _:
+                return 1
+
+    def handle(self, request: bytes, now: float) -> bytes:
+        command_code = CommandCode(chr(request[2]))
+        match command_code:
+            case CommandCode.DISPLAY:
+                self.request_times.append(now)
+                self.relay_value = ((request[23] - 0x30) << 4) | (request[24] - 0x30)
+                voice_code = int(request[25:27])
+                if voice_code and now >= self.voice_until:
+                    self.voice_code = VoiceCode(voice_code)
+                    self.voice_until = now + self.script.voice_durations.get(
+                        self.voice_code, self.script.default_voice_duration
+                    )
+            case CommandCode.PRINTER:
+                if self.printer_status(now) == PrinterStatus.NORMAL:
+                    self.print_jobs += 1
+                    self.printing_until = now + self.script.print_duration
+            case CommandCode.TEMPERATURE:
+                self.fan_trigger_temp = int(request[3:5])
+                self.heater_trigger_temp = int(request[5:7])
+        return self.encode_response(request[1], command_code, now)
+
+    def printer_status(self, now: float) -> PrinterStatus:
+        _, t = self.script_time(now)
+        if any(paper_out.at <= t < paper_out.until for paper_out in self.script.paper_outs):
+            return PrinterStatus.NO_PAPER
+        if now < self.printing_until:
+            return PrinterStatus.TRANSMITTING
+        return PrinterStatus.NORMAL
+
+    def weight(self, t: float) -> tuple[float, WeightStatus]:
+        weight, status = 0.0, WeightStatus.STABLE
+        for ramp in self.ramps:
+            if t < ramp.at:
+                break
+            if t < ramp.at + ramp.duration:
+                progress = (t - ramp.at) / ramp.duration
+                weight, status = weight + (ramp.target - weight) * progress, WeightStatus.UNSTABLE
+            elif t < ramp.at + ramp.duration + ramp.settle:
+                weight, status = ramp.target, WeightStatus.UNSTABLE
+            else:
+                weight, status = ramp.target, WeightStatus.STABLE
+        return weight, status
+
+    def take_input(self, kind: str, events: list, cycle: int, t: float):
+        # Single-Slot Mailbox: 한 번 읽히면 소멸, 읽히지 않아도 3초 후 소멸
+        for index, event in enumerate(events):
+            key = (cycle, index, kind)
+            if event.at <= t < event.at + INPUT_LIFETIME and key not in self.delivered:
+                self.delivered.add(key)
+                return event
+        return None
+
+    def encode_response(self, device_id: int, command_code: CommandCode, now: float) -> bytes:
+        cycle, t = self.script_time(now)
+
+        tag = self.take_input("tag", self.script.tags, cycle, t)
+        key = self.take_input("key", self.script.keys, cycle, t)
+        rfid_card_uid = f"{tag.uid:0>8.8}" if tag else "00000000"
+        user_command_code = key.code if key else InputCode.NONE
+        user_input = f"{key.value:0>6.6}" if key else "000000"
+
+        high_nibble = (self.relay_value & 0b11110000) >> 4
+        low_nibble = self.relay_value & 0b00001111
+        relay = chr(high_nibble + 0x30) + chr(low_nibble + 0x30)
+
+        voice_code = self.voice_code if now < self.voice_until else VoiceCode.NONE
+
+        weight, weight_status = self.weight(t)
+        sign = "-" if weight < 0 else "+"
+        weight_field = f"{weight_status},{WeightType.NET},{sign}{abs(weight):7.1f}kg"
+
+        body = (
+            f"{chr(device_id)}{command_code}{rfid_card_uid}{user_command_code}{user_input}"
+            f"{relay}00{voice_code:02d}025{self.fan_trigger_temp:02d}{self.heater_trigger_temp:02d}"
+            f"{self.printer_status(now).value}0000{weight_field}"
+        )
+        return bytes([STX, *body.encode(), ETX])
+
+    def inject_noise(self, response: bytes) -> bytes:
+        if self.noise and self.random.random() < self.noise:
+            return bytes([self.random.randrange(256)]) + response
+        return response
+
+
+class EmulatorHub:
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.emulators: list[SuwolEmulator] = []
+        self.pending: list[tuple[float, int, int, bytes]] = []
+        self.sequence = 0
+        self.stop_event = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.logger = get_logger()
+
+    def add(self, emulator: SuwolEmulator) -> str:
+        self.emulators.append(emulator)
+        self.selector.register(emulator.master_fd, selectors.EVENT_READ, emulator)
+        return emulator.port
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="SuwolEmulatorHub", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=3.0)
+        self.selector.close()
+        for emulator in self.emulators:
+            emulator.close()
+
+    def run(self):
+        self.logger.info("sys.emulator.started", stations=len(self.emulators))
+        while not self.stop_event.is_set():
+            timeout = 0.05
+            if self.pending:
+                timeout = min(timeout, max(0.0, self.pending[0][0] - time.monotonic()))
+
+            for key, _ in self.selector.select(timeout):
+                emulator: SuwolEmulator = key.data
+                try:
+                    data = os.read(emulator.master_fd, 4096)
+                except (BlockingIOError, OSError):
+                    continue
+                for due, payload in emulator.feed(data, time.monotonic()):
+                    heapq.heappush(self.pending, (due, self.sequence, emulator.master_fd, payload))
+                    self.sequence += 1
+
+            now = time.monotonic()
+            while self.pending and self.pending[0][0] <= now:
+                _, _, fd, payload = heapq.heappop(self.pending)
+                try:
+                    os.write(fd, payload)
+                except (BlockingIOError, OSError):
+                    pass
+        self.logger.info("sys.emulator.stopped")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SUWOL-1000 pseudo-terminal emulator")
+    parser.add_argument("--stations", type=int, default=1)
+    parser.add_argument("--rfid", default="1A2B3C4D")
+    parser.add_argument("--period", type=float, default=15.0)
+    parser.add_argument("--noise", type=float, default=0.0)
+    args = parser.parse_args()
+
+    hub = EmulatorHub()
+    for _ in range(args.stations):
+        port = hub.add(SuwolEmulator(EmulatorScript.truck_cycle(args.rfid, period=args.period), noise=args.noise))
+        print(port)
+    hub.start()
+
+    try:
+        hub.stop_event.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# engine.py
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import os
+import queue
+import selectors
+import threading
+import time
+
+import serial
+import structlog
+from structlog.stdlib import get_logger
+
+from suwol1000 import RESPONSE_LENGTH, RequestPacket, ResponseFrame, WeighingStationWorker, WorkerStep
+
+
+@dataclass(eq=False)
+class StationChannel:
+    worker: WeighingStationWorker
+    name: str
+    steps: WorkerStep | None = None
+    fd: int | None = None
+    outbound: memoryview | None = None
+    received: int = 0
+    awaiting_response: bool = False
+    token: int = 0
+    terminated: threading.Event = field(default_factory=threading.Event)
+
+
+class MultiplexedSerialEngine:
+    # 여러 계근대의 SerialClient 를 하나의 selector 스레드에서 구동 (POSIX 전용)
+    # 워커의 상태 핸들러(제너레이터)가 yield 하는 요청/대기를 논블로킹 I/O 와 데드라인 타이머로 처리한다
+    def __init__(self, name: str = "WeighingStationEngine"):
+        self.name = name
+        self.selector = selectors.DefaultSelector()
+        self.channels: dict[WeighingStationWorker, StationChannel] = {}
+        self.commands: queue.SimpleQueue[tuple[str, StationChannel]] = queue.SimpleQueue()
+        self.timers: list[tuple[float, int, int, StationChannel]] = []
+        self.sequence = itertools.count()
+        self.thread: threading.Thread | None = None
+        self.active: StationChannel | None = None
+        self.logger = get_logger().bind(engine=name)
+
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ, None)
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+            self.thread.start()
+
+    def attach(self, worker: WeighingStationWorker, name: str):
+        channel = StationChannel(worker=worker, name=name)
+        self.channels[worker] = channel
+        self.commands.put(("attach", channel))
+        self.wakeup()
+        self.start()
+
+    def detach(self, worker: WeighingStationWorker, timeout: float = 3.0) -> bool:
+        channel = self.channels.pop(worker)
+        worker.stop()
+        self.commands.put(("detach", channel))
+        self.wakeup()
+        return channel.terminated.wait(timeout)
+
+    def wakeup(self):
+        try:
+            os.write(self.wakeup_w, b"\0")
+        except BlockingIOError:
+            pass
+
+    def run(self):
+        self.logger.info("sys.engine.started")
+        while True:
+            timeout = None
+            if self.timers:
+                timeout = max(0.0, self.timers[0][0] - time.monotonic())
+
+            try:
+                for key, mask in self.selector.select(timeout):
+                    if key.data is None:
+                        self.drain_commands()
+                        continue
+                    channel: StationChannel = key.data
+                    if channel.fd != key.fd:
+                        continue
+                    self.active = channel
+                    if mask & selectors.EVENT_WRITE:
+                        self.on_writable(channel)
+                    if mask & selectors.EVENT_READ and channel.fd == key.fd:
+                        self.on_readable(channel)
+
+                now = time.monotonic()
+                while self.timers and self.timers[0][0] <= now:
+                    _, _, token, channel = heapq.heappop(self.timers)
+                    if token == channel.token:
+                        self.active = channel
+                        self.on_deadline(channel)
+
+            except Exception:
+                self.logger.exception("sys.engine.unexpected_error")
+
+            finally:
+                self.active = None
+
+    def thread_labels(self) -> dict[int, str]:
+        # 프로파일러용: 엔진 스레드가 지금 구동 중인 계근대 이름
+        channel = self.active
+        if self.thread is None or channel is None:
+            return {}
+        return {self.thread.ident: f"{self.name}/{channel.name}"}
+
+    def drain_commands(self):
+        try:
+            while os.read(self.wakeup_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        while True:
+            try:
+                command, channel = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            match command:
+                case "attach":
+                    channel.worker.logger.info("sys.worker.started", engine=self.name)
+                    self.resume(channel)
+                case "detach":
+                    self.terminate(channel)
+
+    def resume(self, channel: StationChannel, result: ResponseFrame | None = None, error: Exception | None = None):
+        worker = channel.worker
+        channel.token += 1
+
+        while True:
+            if channel.steps is None:
+                if worker.stop_event.is_set():
+                    self.terminate(channel)
+                    return
+                channel.steps = worker.step()
+                result, error = None, None
+
+            structlog.contextvars.bind_contextvars(state=worker.state.name)
+            try:
+                operation = channel.steps.throw(error) if error is not None else channel.steps.send(result)
+            except StopIteration as stop:
+                worker.state = stop.value
+                channel.steps = None
+                continue
+
+            self.sync_registration(channel)
+            if isinstance(operation, RequestPacket):
+                try:
+                    self.send(channel, operation)
+                except Exception as e:
+                    result, error = None, e
+                    continue
+            else:
+                self.schedule(channel, operation)
+            return
+
+    def sync_registration(self, channel: StationChannel):
+        client = channel.worker.client
+        fd = client.serial.fileno() if client.serial is not None and client.serial.is_open else None
+        if fd == channel.fd:
+            return
+        if channel.fd is not None:
+            self.selector.unregister(channel.fd)
+        if fd is not None:
+            self.selector.register(fd, selectors.EVENT_READ, channel)
+        channel.fd = fd
+
+    def schedule(self, channel: StationChannel, delay: float):
+        heapq.heappush(self.timers, (time.monotonic() + delay, next(self.sequence), channel.token, channel))
+
+    def send(self, channel: StationChannel, request: RequestPacket):
+        if channel.fd is None:
+            raise serial.SerialException("Serial port is not connected")
+
+        # 이전 폴링의 잔여 바이트는 이번 요청의 응답이 아니므로 버린다
+        channel.worker.client.framer.clear()
+        channel.received = 0
+        channel.outbound = memoryview(request.to_bytes())
+        channel.awaiting_response = False
+        self.schedule(channel, channel.worker.client.write_timeout)
+        self.on_writable(channel)
+        if channel.outbound is not None:
+            self.selector.modify(channel.fd, selectors.EVENT_READ | selectors.EVENT_WRITE, channel)
+
+    def on_writable(self, channel: StationChannel):
+        if channel.outbound is None:
+            return
+        try:
+            written = os.write(channel.fd, channel.outbound)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            channel.outbound = None
+            self.resume(channel, error=serial.SerialException(f"write failed: {e}"))
+            return
+
+        channel.outbound = channel.outbound[written:]
+        if channel.outbound:
+            return
+
+        channel.outbound = None
+        self.selector.modify(channel.fd, selectors.EVENT_READ, channel)
+        channel.awaiting_response = True
+        channel.token += 1
+        self.schedule(channel, channel.worker.client.timeout)
+        self.deliver(channel)
+
+    def on_readable(self, channel: StationChannel):
+        try:
+            data = os.read(channel.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.resume(channel, error=serial.SerialException(f"read failed: {e}"))
+            return
+
+        if not data:
+            self.resume(channel, error=serial.SerialException("device reports readiness to read but returned no data"))
+            return
+
+        channel.worker.client.framer.feed(data)
+        if channel.awaiting_response:
+            channel.received += len(data)
+        self.deliver(channel)
+
+    def deliver(self, channel: StationChannel):
+        if not channel.awaiting_response:
+            return
+        framer = channel.worker.client.framer
+        frame = framer.next_frame()
+        if frame is None:
+            # SerialClient.send_and_receive 와 동일: 1프레임 분량을 받았는데 후보가 없으면 바로 실패
+            if channel.received >= RESPONSE_LENGTH and not framer.pending:
+                channel.awaiting_response = False
+                self.resume(channel, error=ValueError(f"Corrupted response frame: {channel.received} bytes discarded"))
+            return
+
+        channel.awaiting_response = False
+        try:
+            response = ResponseFrame.from_bytes(frame)
+        except ValueError as e:
+            self.resume(channel, error=e)
+            return
+        self.resume(channel, result=response)
+
+    def on_deadline(self, channel: StationChannel):
+        if channel.outbound is not None:
+            channel.outbound = None
+            self.selector.modify(channel.fd, selectors.EVENT_READ, channel)
+            self.resume(channel, error=serial.SerialTimeoutException("Write timeout"))
+        elif channel.awaiting_response:
+            channel.awaiting_response = False
+            pending = channel.worker.client.framer.pending
+            self.resume(channel, error=ValueError(f"Response timeout: {pending} bytes pending"))
+        else:
+            self.resume(channel)
+
+    def terminate(self, channel: StationChannel):
+        if channel.terminated.is_set():
+            return
+        channel.token += 1
+        if channel.steps is not None:
+            channel.steps.close()
+            channel.steps = None
+        if channel.fd is not None:
+            self.selector.unregister(channel.fd)
+            channel.fd = None
+        channel.worker.client.disconnect()
+        channel.worker.logger.info("sys.worker.terminated", engine=self.name)
+        channel.terminated.set()
@@ -19,3 +19,17 @@ class RFIDTaggedEvent(BaseEvent):
 class WeighingCompletedEvent(BaseEvent):
     rfid_card_uid: str
     weight: int
+    time_to_stable: float | None = None
+
+
+@dataclass(frozen=True)
+class PrintJobQueuedEvent(BaseEvent):
+    station_id: int | None
+    record_uuid: str
+    document: bytes
+
+
+@dataclass(frozen=True)
+class PrintJobCompletedEvent(BaseEvent):
+    station_id: int | None
+    job_uuid: str
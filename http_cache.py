@@ -0,0 +1,89 @@
+# http_cache.py
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+from typing import Any, Dict
+
+import httpx
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    etag: str | None = None
+    last_modified: str | None = None
+    size: int = 0
+    body: Any = None    # 작은 응답만 본문까지 저장, 시세 데이터는 SQLite 테이블이 본문 역할
+
+    @classmethod
+    def from_response(cls, key: str, response: httpx.Response) -> "CacheEntry":
+        return cls(key=key, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+
+
+class HTTPCache:
+    # 읽기 전용 GET 의 검증자(ETag/Last-Modified)를 파일 하나에 항목 하나로 저장
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key(url: str, access_token: str) -> str:
+        # 토큰이 게이트웨이를 식별: 재프로비저닝되면 다른 키가 되어 이전 게이트웨이의 검증자를 쓰지 않는다
+        return hashlib.sha256(f"{access_token}\n{url}".encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> CacheEntry | None:
+        try:
+            with open(self.path(key), encoding="utf-8") as f:
+                return CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, entry: CacheEntry):
+        if entry.etag is None and entry.last_modified is None:
+            # 검증자를 주지 않는 응답: 남아 있던 이전 검증자도 더는 유효하지 않다
+            self.discard(entry.key)
+            return
+        # 쓰는 도중 전원이 나가도 반쯤 쓴 항목이 남지 않도록 임시 파일에 쓰고 교체
+        temp_path = f"{self.path(entry.key)}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(entry), f, ensure_ascii=False)
+        os.replace(temp_path, self.path(entry.key))
+
+    def discard(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry | None) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def record(self, response: httpx.Response, entry: CacheEntry | None):
+        if response.status_code == 304 and entry is not None:
+            self.hits += 1
+            self.bytes_saved += entry.size
+        else:
+            self.misses += 1
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "http_cache_hits": self.hits,
+            "http_cache_misses": self.misses,
+            "http_cache_hit_ratio": round(self.hits / requests, 3) if requests else None,
+            "http_cache_bytes_saved": self.bytes_saved,
+        }
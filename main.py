@@ -1,7 +1,10 @@
 # main.py
 import asyncio
+from datetime import datetime
 import json
 import ssl
+import time
+from typing import Literal
 
 import certifi
 import httpx
@@ -12,13 +15,17 @@ from tortoise.transactions import in_transaction
 from websockets.exceptions import ConnectionClosed
 import websockets
 
-from api import APIClient, AuthDegradedError
-from cache import MarketDataCache, RFIDInfo
-from events import BaseEvent, WeighingCompletedEvent
+from api import APIClient, AuthDegradedError, DeltaUnavailableError, MarketDataDelta
+from cache import MarketDataCache, build_market_snapshot
+from events import BaseEvent, PrintJobCompletedEvent, PrintJobQueuedEvent, WeighingCompletedEvent
 from managers import WeighingStationManager
-from models import Gateway, Record, WeighingStation, Species, Producer, RFIDCard
+from models import Gateway, WeighingStation, Species, Producer, PrintJob, RFIDCard, SyncState
+from profiler import StackSampler
+from resolver import RemoteRFIDResolver
+from storage import STORAGE_PROFILES
+from transport import EventTransport
 from utils import get_hostname, get_ip_address, get_mac_address, scan_peripherals
-from workers import HeartbeatWorker, RecordUploadWorker
+from workers import HeartbeatWorker, RecordUploadWorker, RecordWriter, StorageMaintenanceWorker
 
 
 def setup_logging():
@@ -37,11 +44,22 @@ def setup_logging():
     )
 
 
+MARKET_RESOURCES = ("species", "producers", "rfid_cards")
+
+
 class HeadlessClient:
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        station_engine: Literal["thread", "multiplexed"] = "thread",
+        storage_profile: str = "performance",
+    ):
         self.base_url = base_url.rstrip("/")
+        self.storage_profile = STORAGE_PROFILES[storage_profile]
+        self.db_path = "db.sqlite3"
+        self.maintenance_task: asyncio.Task | None = None
 
-        self.api_client = APIClient(base_url=self.base_url)
+        self.api_client = APIClient(base_url=self.base_url, cache_dir="http_cache")
         self.ws_url = self.base_url.replace("http://", "ws://").replace("https://", "wss://")
         self.provisioning_url = f"{self.ws_url}/ws/devices/gateways/provisioning/"
 
@@ -57,13 +75,28 @@ class HeadlessClient:
         self.gateway_id: int | None = None
 
         self.market_cache = MarketDataCache()
-        self.upload_queue: asyncio.Queue[str] = asyncio.Queue()
-        self.event_queue: asyncio.Queue[BaseEvent] = asyncio.Queue()
+        self.market_chunk_size = 1000
+        self.market_chunk_buffer = 4
+        self.upload_wakeup = asyncio.Event()
+        # 동시에 끝난 계근을 한 트랜잭션으로 묶어 저장 (SQLite 커밋/fsync 횟수 절감)
+        # 묶는 시간(commit window)은 전달 계층의 coalesce_window: 깨어난 뒤 그만큼 더 모아 한 묶음으로 넘긴다
+        self.event_transport = EventTransport(coalesce_window=0.005)
+        self.record_writer = RecordWriter()
+        self.commit_batch_size = 64
+        self.rfid_resolver = RemoteRFIDResolver(
+            api_client=self.api_client,
+            market_cache=self.market_cache,
+            access_token=lambda: self.access_token,
+            on_card=self.save_resolved_card,
+        )
         self.station_manager = WeighingStationManager(
             on_event=self.handle_hardware_event,
             market_cache = self.market_cache,
+            engine=station_engine,
+            rfid_resolver=self.rfid_resolver,
         )
         self.main_loop = None
+        self.profile_task: asyncio.Task | None = None
 
         self.ws_kwargs = {}
         if self.ws_url.startswith("wss://"):
@@ -71,54 +104,103 @@ class HeadlessClient:
 
 
     def handle_hardware_event(self, event: BaseEvent):
-        self.main_loop.call_soon_threadsafe(self.event_queue.put_nowait, event)
+        self.event_transport.put(event)
     
     async def event_consumer_worker(self):
-        self.logger.info("sys.worker.event_consumer.started")
+        self.logger.info(
+            "sys.worker.event_consumer.started",
+            commit_window=self.event_transport.coalesce_window,
+            commit_batch_size=self.commit_batch_size,
+        )
         while True:
-            event = await self.event_queue.get()
+            events = await self.event_transport.get_batch(self.commit_batch_size)
             try:
-                if isinstance(event, WeighingCompletedEvent):
+                weighings = [event for event in events if isinstance(event, WeighingCompletedEvent)]
+                for event in weighings:
                     self.logger.info(
                         "biz.weighing.completed", 
                         event_id=event.uuid,
                         rfid=event.rfid_card_uid, 
-                        weight=event.weight
-                    )
-
-                    record = await Record.create(
-                        uuid=event.uuid,
-                        rfid_card_uid=event.rfid_card_uid,
                         weight=event.weight,
-                        measured_at=event.timestamp,
+                        time_to_stable=event.time_to_stable,
                     )
 
-                    self.logger.info("biz.record.created", uuid=str(record.uuid), weight=event.weight)
+                if weighings:
+                    for event in await self.record_writer.write(weighings):
+                        self.logger.info("biz.record.created", uuid=event.uuid, weight=event.weight)
 
-                    await self.upload_queue.put(str(event.uuid))
+                    self.upload_wakeup.set()
+
+                    self.logger.debug(
+                        "sys.db.group_commit.completed",
+                        size=len(weighings),
+                        **self.record_writer.stats(),
+                        **self.event_transport.stats(),
+                    )
 
-                    self.logger.debug("biz.record.queued_for_upload", queue_size=self.upload_queue.qsize())
+                await self.save_print_jobs(events)
 
             except Exception:
-                event_id = getattr(event, 'uuid', 'unknown')
-                self.logger.exception("biz.record.local_save_failed", event_id=event_id)
-            finally:
-                self.event_queue.task_done()
+                event_ids = [getattr(event, 'uuid', 'unknown') for event in events]
+                self.logger.exception("biz.record.local_save_failed", event_ids=event_ids)
+
+    async def save_print_jobs(self, events: list[BaseEvent]):
+        # 같은 묶음 안에서 추가되고 바로 출력된 전표는 DB 에 쓰지 않는다
+        completed = {event.job_uuid for event in events if isinstance(event, PrintJobCompletedEvent)}
+        queued = [
+            event for event in events
+            if isinstance(event, PrintJobQueuedEvent) and event.uuid not in completed
+        ]
+        if not queued and not completed:
+            return
+
+        async with in_transaction():
+            if queued:
+                await PrintJob.bulk_create([
+                    PrintJob(
+                        uuid=event.uuid,
+                        station_id=event.station_id,
+                        record_uuid=event.record_uuid,
+                        document=event.document,
+                        created_at=event.timestamp,
+                    )
+                    for event in queued
+                ])
+            if completed:
+                await PrintJob.filter(uuid__in=completed).delete()
+        self.logger.debug("sys.db.print_spool.saved", queued=len(queued), completed=len(completed))
+
+    async def load_print_jobs(self) -> list[PrintJobQueuedEvent]:
+        return [
+            PrintJobQueuedEvent(
+                uuid=str(job.uuid),
+                timestamp=job.created_at,
+                station_id=job.station_id,
+                record_uuid=str(job.record_uuid),
+                document=bytes(job.document),
+            )
+            for job in await PrintJob.all().order_by("created_at")
+        ]
 
     async def close(self):
         self.station_manager.stop_all()
         await self.api_client.close()
+        if self.maintenance_task is not None:
+            self.maintenance_task.cancel()
+        try:
+            await Tortoise.get_connection("default").execute_script("PRAGMA optimize")
+        except Exception:
+            self.logger.warning("sys.db.maintenance.optimize_skipped")
         await Tortoise.close_connections()
         self.logger.info("sys.lifecycle.process.shutdown")
 
     async def setup(self):
         self.logger.info("sys.lifecycle.process.startup", server_url=self.api_client.client.base_url)
-        await Tortoise.init(
-            db_url="sqlite://db.sqlite3",
-            modules={"models": ["models"]},
-        )
+        await Tortoise.init(config=self.storage_profile.tortoise_config(self.db_path))
         await Tortoise.generate_schemas()
-        self.logger.debug("sys.db.schema.ready")
+        self.logger.debug("sys.db.schema.ready", **self.storage_profile.pragmas())
+
+        self.maintenance_task = asyncio.create_task(StorageMaintenanceWorker().run())
     
     async def wipe_local_auth(self):
         self.logger.warning("sys.auth.local_db.wipe")
@@ -194,14 +276,18 @@ class HeadlessClient:
                 )
 
             deleted_count = await WeighingStation.filter(id__not_in=station_ids).delete()
+            # 삭제된 계근대의 전표 (이벤트가 늦게 기록되어 남은 행도 다음 동기화에서 지워진다)
+            dropped_print_jobs = await PrintJob.filter(station_id__not_in=station_ids).delete()
             
             current_stations = await WeighingStation.all()
+            self.station_manager.restore_print_jobs(await self.load_print_jobs())
             self.station_manager.sync(current_stations)
 
             self.logger.info(
                 "sys.sync.weighing_stations.completed",
                 synced_count=len(retrieved_stations),
                 deleted_count=deleted_count,
+                dropped_print_jobs=dropped_print_jobs,
             )
 
         except httpx.HTTPStatusError as e:
@@ -217,38 +303,23 @@ class HeadlessClient:
     async def sync_market_data(self):
         self.logger.info("sys.sync.market_data.started")
         try:
-            species_data = await self.api_client.fetch_species(self.access_token)
-            producers_data = await self.api_client.fetch_producers(self.access_token)
-            rfid_cards_data = await self.api_client.fetch_rfid_cards(self.access_token)
-
-            async with in_transaction():
-                await RFIDCard.all().delete()
-                await Producer.all().delete()
-                await Species.all().delete()
-
-                await Species.bulk_create([Species(**s) for s in species_data])
-                await Producer.bulk_create([Producer(**p) for p in producers_data])
-                
-                rfid_cards = []
-                for data in rfid_cards_data:
-                    rfid_cards.append(RFIDCard(
-                        id=data["id"],
-                        uuid=data["uuid"],
-                        uid=data["uid"],
-                        producer_id=data["producer"],
-                        species_id=data["species"],
-                        is_active=data["is_active"],
-                        issued_at=data["issued_at"],
-                        last_used_at=data.get("last_used_at")
-                    ))
-                await RFIDCard.bulk_create(rfid_cards)
-
-            self.logger.info(
-                "sys.sync.market_data.completed", 
-                species=len(species_data), 
-                producers=len(producers_data), 
-                rfids=len(rfid_cards_data)
-            )
+            # 첫 부팅, 게이트웨이 변경, 서버가 변경 이력을 더는 갖고 있지 않을 때(410)만 전체 재구성
+            # 변경분 형식이 아닌 응답도 삭제를 알 수 없으므로 전체 재구성 (이때는 기준 시각도 남지 않아 다음부터 바로 전체)
+            # 이 게이트웨이로 동기화를 마친 적이 있어야 테이블이 검증자와 일치하므로 그때만 조건부 요청
+            states = {state.resource: state for state in await SyncState.filter(gateway_id=self.gateway_id)}
+            synced = states.keys() >= set(MARKET_RESOURCES)
+            if synced:
+                try:
+                    await self.stream_market_data(states)
+                    return
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 410:
+                        raise
+                    self.logger.warning("sys.sync.market_data.delta_expired", action="full_rebuild")
+                except DeltaUnavailableError:
+                    self.logger.warning("sys.sync.market_data.delta_unavailable", action="full_rebuild")
+
+            await self.stream_market_data(None, conditional=synced)
 
         except httpx.HTTPStatusError as e:
             if e.response.status_code in (401, 403):
@@ -260,26 +331,237 @@ class HeadlessClient:
         except Exception:
             self.logger.exception("sys.sync.market_data.fatal_error")
 
+    async def stream_market_data(self, states: dict[str, SyncState] | None, conditional: bool = False):
+        # states 가 None 이면 전체 재구성: 받은 id 를 표시(mark)해 두고 끝에 표시되지 않은 행만 지운다(sweep)
+        # 세 리소스를 동시에 받고, 카드는 받는 대로 청크 단위로 큐를 거쳐 커밋 (메모리는 청크 크기 x 버퍼 수로 제한)
+        full = states is None
+        since = {resource: None if full else states[resource].high_water for resource in MARKET_RESOURCES}
+        if full:
+            await self.reset_sync_marks()
+
+        card_chunks: asyncio.Queue[MarketDataDelta | None] = asyncio.Queue(maxsize=self.market_chunk_buffer)
+        parents_committed = asyncio.Event()
+        try:
+            async with asyncio.TaskGroup() as tg:
+                parents = tg.create_task(self.sync_market_parents(since, full, conditional, parents_committed))
+                tg.create_task(self.fetch_rfid_card_chunks(since["rfid_cards"], conditional, card_chunks))
+                cards = tg.create_task(self.write_rfid_card_chunks(card_chunks, parents_committed, full))
+        except ExceptionGroup as eg:
+            # 첫 오류를 그대로 올려 sync_market_data 의 HTTP 오류 처리(410 재구성, 401/403)로 넘긴다
+            raise eg.exceptions[0]
+
+        species, producers = parents.result()
+        rfid_cards, cards_written, cards_deleted = cards.result()
+        deltas = {"rfid_card": rfid_cards, "producer": producers, "species": species}
+
+        async with in_transaction() as conn:
+            if full:
+                # 304 로 건너뛴 테이블은 표시가 없으므로 쓸지 않는다
+                for table, delta in deltas.items():
+                    if not delta.not_modified:
+                        await self.sweep_unmarked(conn, table)
+            await self.save_sync_state(
+                previous=states,
+                species=species.server_time,
+                producers=producers.server_time,
+                rfid_cards=rfid_cards.server_time,
+            )
+        for delta in deltas.values():
+            self.api_client.commit_validator(delta)
+
+        self.logger.info(
+            "sys.sync.market_data.completed",
+            mode="full" if full else "delta",
+            species=len(species.results),
+            producers=len(producers.results),
+            rfids=cards_written,
+            deleted=len(species.deleted_ids) + len(producers.deleted_ids) + cards_deleted,
+            not_modified=[table for table, delta in deltas.items() if delta.not_modified],
+            **self.api_client.cache_stats(),
+        )
+
+    async def sync_market_parents(
+        self,
+        since: dict[str, str | None],
+        full: bool,
+        conditional: bool,
+        committed: asyncio.Event,
+    ) -> tuple[MarketDataDelta, MarketDataDelta]:
+        species, producers = await asyncio.gather(
+            self.api_client.fetch_species(self.access_token, since["species"], conditional),
+            self.api_client.fetch_producers(self.access_token, since["producers"], conditional),
+        )
+
+        async with in_transaction() as conn:
+            if producers.deleted_ids:
+                await Producer.filter(id__in=producers.deleted_ids).delete()
+            if species.deleted_ids:
+                await Species.filter(id__in=species.deleted_ids).delete()
+
+            if species.results:
+                await self.upsert_species(species.results)
+            if producers.results:
+                await self.upsert_producers(producers.results)
+
+            if full and not species.not_modified:
+                await self.mark_synced(conn, "species", [s["id"] for s in species.results])
+            if full and not producers.not_modified:
+                await self.mark_synced(conn, "producer", [p["id"] for p in producers.results])
+
+        committed.set()
+        return species, producers
+
+    async def upsert_species(self, rows: list[dict]):
+        await Species.bulk_create(
+            [Species(**s) for s in rows],
+            on_conflict=["id"],
+            update_fields=["name"],
+        )
+
+    async def upsert_producers(self, rows: list[dict]):
+        await Producer.bulk_create(
+            [Producer(**p) for p in rows],
+            on_conflict=["id"],
+            update_fields=["uuid", "name", "phone", "created_at"],
+        )
+
+    async def fetch_rfid_card_chunks(
+        self,
+        updated_since: str | None,
+        conditional: bool,
+        chunks: asyncio.Queue[MarketDataDelta | None],
+    ):
+        async for chunk in self.api_client.iter_rfid_card_chunks(
+            self.access_token, updated_since, self.market_chunk_size, conditional
+        ):
+            # 버퍼가 차면 쓰기가 따라올 때까지 응답 본문을 더 읽지 않는다
+            await chunks.put(chunk)
+        await chunks.put(None)
+
+    async def write_rfid_card_chunks(
+        self,
+        chunks: asyncio.Queue[MarketDataDelta | None],
+        parents_committed: asyncio.Event,
+        full: bool,
+    ) -> tuple[MarketDataDelta, int, int]:
+        # 카드는 species/producer 를 참조하므로 부모 테이블이 커밋된 뒤에 쓴다 (그동안 청크는 큐에서 대기)
+        await parents_committed.wait()
+
+        # 받는 중에 바뀐 카드는 다음 동기화에서 다시 받도록 첫 청크의 서버 시각을 기준으로 삼는다 (검증자, 304 여부도 첫 청크)
+        first, written, deleted = None, 0, 0
+        while (chunk := await chunks.get()) is not None:
+            if first is None:
+                first = chunk
+
+            async with in_transaction() as conn:
+                if chunk.deleted_ids:
+                    await RFIDCard.filter(id__in=chunk.deleted_ids).delete()
+                if chunk.results:
+                    await self.upsert_rfid_cards(conn, chunk.results)
+                    if full:
+                        await self.mark_synced(conn, "rfid_card", [data["id"] for data in chunk.results])
+
+            written += len(chunk.results)
+            deleted += len(chunk.deleted_ids)
+
+        return first or MarketDataDelta(results=[], deleted_ids=[], server_time=None), written, deleted
+
+    async def upsert_rfid_cards(self, conn, rows: list[dict]):
+        # 카드 수만큼 모델 인스턴스를 만드는 비용이 동기화 CPU 의 대부분이라 RecordWriter 처럼 직접 INSERT
+        card_fields = RFIDCard._meta.fields_map
+        for i in range(0, len(rows), 500):
+            chunk = rows[i:i + 500]
+            uids = [data["uid"] for data in chunk]
+            ids = [data["id"] for data in chunk]
+            # 재발급으로 같은 uid 가 다른 id 로 들어오면 UNIQUE 충돌 전에 이전 카드를 지운다
+            await conn.execute_query(
+                f'DELETE FROM "rfid_card" WHERE "uid" IN ({", ".join(["?"] * len(uids))})'
+                f' AND "id" NOT IN ({", ".join(["?"] * len(ids))})',
+                uids + ids,
+            )
+
+            values = []
+            for data in chunk:
+                last_used_at = data.get("last_used_at")
+                values += [
+                    data["id"],
+                    card_fields["uuid"].to_db_value(data["uuid"], RFIDCard),
+                    data["uid"],
+                    data["producer"],
+                    data["species"],
+                    card_fields["is_active"].to_db_value(data["is_active"], RFIDCard),
+                    card_fields["issued_at"].to_db_value(datetime.fromisoformat(data["issued_at"]), RFIDCard),
+                    card_fields["last_used_at"].to_db_value(
+                        datetime.fromisoformat(last_used_at) if last_used_at else None, RFIDCard
+                    ),
+                ]
+            await conn.execute_query(
+                'INSERT INTO "rfid_card" ("id", "uuid", "uid", "producer_id", "species_id", "is_active", "issued_at", "last_used_at") VALUES '
+                + ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+                + ' ON CONFLICT ("id") DO UPDATE SET "uuid" = excluded."uuid", "uid" = excluded."uid",'
+                ' "producer_id" = excluded."producer_id", "species_id" = excluded."species_id",'
+                ' "is_active" = excluded."is_active", "issued_at" = excluded."issued_at",'
+                ' "last_used_at" = excluded."last_used_at"',
+                values,
+            )
+
+    async def reset_sync_marks(self):
+        conn = Tortoise.get_connection("default")
+        for table in ("species", "producer", "rfid_card"):
+            await conn.execute_script(
+                f"DROP TABLE IF EXISTS temp.sync_mark_{table};"
+                f"CREATE TEMP TABLE sync_mark_{table} (id INTEGER PRIMARY KEY);"
+            )
+
+    async def mark_synced(self, conn, table: str, ids: list[int]):
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            await conn.execute_query(
+                f"INSERT OR IGNORE INTO temp.sync_mark_{table} (id) VALUES {', '.join(['(?)'] * len(chunk))}",
+                chunk,
+            )
+
+    async def sweep_unmarked(self, conn, table: str):
+        await conn.execute_query(f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM temp.sync_mark_{table})")
+        await conn.execute_query(f"DROP TABLE temp.sync_mark_{table}")
+
+    async def save_sync_state(self, previous: dict[str, SyncState] | None = None, **high_waters: str | None):
+        await SyncState.exclude(gateway_id=self.gateway_id).delete()
+        for resource, high_water in high_waters.items():
+            if high_water is None and previous:
+                # 변경분 동기화에서 None 은 304 뿐: 테이블이 그대로이므로 이전 기준 시각을 유지
+                high_water = previous[resource].high_water
+            if high_water is None:
+                # 기준 시각을 알 수 없으면 다음 동기화도 전체 재구성
+                await SyncState.filter(resource=resource).delete()
+                continue
+            await SyncState.update_or_create(
+                resource=resource,
+                defaults={"gateway_id": self.gateway_id, "high_water": high_water},
+            )
+
     async def refresh_market_cache(self):
         self.logger.info("sys.cache.refresh.started")
         try:
-            rfid_cache_data = {}
-            
-            active_cards = await RFIDCard.all().select_related("producer", "species")
-            
-            for card in active_cards:
-                rfid_cache_data[card.uid] = RFIDInfo(
-                    is_active=card.is_active,
-                    producer_name=card.producer.name,
-                    species_name=card.species.name
-                )
-            
-            self.market_cache.update_rfid_data(rfid_cache_data)
+            started_at = time.perf_counter()
+            self.market_cache.begin_rebuild()
+            try:
+                snapshot = await asyncio.to_thread(build_market_snapshot, self.db_path)
+            except Exception:
+                self.market_cache.cancel_rebuild()
+                raise
+            self.market_cache.publish(snapshot)
 
             gateway = await Gateway.get(id=self.gateway_id)
             self.market_cache.gateway_name = gateway.name
 
-            self.logger.info("sys.cache.refresh.completed", cached_rfid_count=len(rfid_cache_data))
+            self.logger.info(
+                "sys.cache.refresh.completed",
+                cached_rfid_count=len(snapshot),
+                producers=len(snapshot.producer_names),
+                species=len(snapshot.species_names),
+                build_ms=round((time.perf_counter() - started_at) * 1000, 1),
+            )
             
         except Exception:
             self.logger.exception("sys.cache.refresh.failed")
@@ -288,6 +570,8 @@ class HeadlessClient:
         setup_logging()
 
         self.main_loop = asyncio.get_running_loop()
+        self.rfid_resolver.loop = self.main_loop
+        self.event_transport.loop = self.main_loop
         await self.setup()
 
         is_running = True
@@ -357,13 +641,6 @@ class HeadlessClient:
         self.logger.info("net.ws.active.connecting", url=target_ws_url)
 
         try:
-            unsynced_records = await Record.all().values_list("uuid", flat=True)
-            for record_uuid in unsynced_records:
-                self.upload_queue.put_nowait(str(record_uuid))
-            
-            if unsynced_records:
-                self.logger.info("sys.recovery.records_enqueued", count=len(unsynced_records))
-            
             await self.sync_market_data()
 
             await self.refresh_market_cache()
@@ -379,7 +656,7 @@ class HeadlessClient:
                 )
                 upload_worker = RecordUploadWorker(
                     api_client=self.api_client,
-                    upload_queue=self.upload_queue,
+                    upload_wakeup=self.upload_wakeup,
                     access_token=self.access_token,
                 )
                 
@@ -411,12 +688,106 @@ class HeadlessClient:
                         self.logger.info("biz.active.sync_stations.executing")
                         await self.sync_weighing_stations()
 
+                    case (
+                        "market.rfid_card.upserted" | "market.rfid_card.deleted"
+                        | "market.producer.upserted" | "market.producer.deleted"
+                        | "market.species.upserted" | "market.species.deleted"
+                    ):
+                        await self.apply_market_event(message_type, data.get("payload") or {})
+
+                    case "profile.capture":
+                        # 캡처 중에도 다른 명령을 처리할 수 있도록 별도 태스크로 실행
+                        if self.profile_task is not None and not self.profile_task.done():
+                            self.logger.warning("sys.profile.capture.busy")
+                            continue
+                        self.profile_task = asyncio.create_task(self.capture_profile(ws, data.get("payload") or {}))
+
                     case _:
                         self.logger.debug("net.ws.message.ignored", type=message_type)
 
             except json.JSONDecodeError:
                 self.logger.error("net.ws.message.invalid_json")
 
+    async def apply_market_event(self, message_type: str, payload: dict):
+        # 서버에서 바뀐 한 건을 SQLite 에 커밋한 뒤 캐시 스냅샷에 덧씌운다 (전체 동기화/재구성 없음)
+        # SyncState 는 그대로 두므로 다음 증분 동기화가 같은 변경을 다시 받아도 결과는 같다
+        started_at = time.perf_counter()
+        try:
+            match message_type:
+                case "market.rfid_card.upserted":
+                    self.rfid_resolver.forget(payload["uid"])
+                    async with in_transaction() as conn:
+                        _, rows = await conn.execute_query('SELECT "uid" FROM "rfid_card" WHERE "id" = ?', [payload["id"]])
+                        await self.upsert_rfid_cards(conn, [payload])
+                    if rows and rows[0][0] != payload["uid"]:
+                        self.market_cache.patch(lambda snapshot, uid=rows[0][0]: snapshot.delete_card(uid))
+                    patched = self.market_cache.patch(
+                        lambda snapshot: snapshot.upsert_card(
+                            payload["uid"], payload["is_active"], payload["producer"], payload["species"]
+                        )
+                    )
+                    if not patched:
+                        # 스냅샷에 아직 없는 생산자/어종: SQLite 에는 들어갔으니 다음 재구성 때 반영
+                        self.logger.warning("sys.cache.patch.parent_missing", rfid_card_id=payload["id"])
+
+                case "market.rfid_card.deleted":
+                    async with in_transaction() as conn:
+                        _, rows = await conn.execute_query('SELECT "uid" FROM "rfid_card" WHERE "id" = ?', [payload["id"]])
+                        await RFIDCard.filter(id=payload["id"]).delete()
+                    if rows:
+                        self.market_cache.patch(lambda snapshot, uid=rows[0][0]: snapshot.delete_card(uid))
+
+                case "market.producer.upserted":
+                    await self.upsert_producers([payload])
+                    self.market_cache.patch(lambda snapshot: snapshot.upsert_producer(payload["id"], payload["name"]))
+
+                case "market.producer.deleted":
+                    # 카드는 FK CASCADE 로 함께 지워지고, 캐시는 이름 슬롯을 비워 가리키던 카드를 모두 무효화
+                    await Producer.filter(id=payload["id"]).delete()
+                    self.market_cache.patch(lambda snapshot: snapshot.delete_producer(payload["id"]))
+
+                case "market.species.upserted":
+                    await self.upsert_species([payload])
+                    self.market_cache.patch(lambda snapshot: snapshot.upsert_species(payload["id"], payload["name"]))
+
+                case "market.species.deleted":
+                    await Species.filter(id=payload["id"]).delete()
+                    self.market_cache.patch(lambda snapshot: snapshot.delete_species(payload["id"]))
+
+            self.logger.info(
+                "biz.market.patch.applied",
+                type=message_type,
+                id=payload.get("id"),
+                elapsed_ms=round((time.perf_counter() - started_at) * 1000, 2),
+            )
+        except Exception:
+            self.logger.exception("biz.market.patch.failed", type=message_type, id=payload.get("id"))
+
+    async def save_resolved_card(self, card: dict):
+        # 원격 조회로 찾은 카드도 웹소켓 변경과 같은 경로로 SQLite 와 캐시에 반영
+        await self.apply_market_event("market.rfid_card.upserted", card)
+
+    async def capture_profile(self, ws, payload: dict):
+        try:
+            duration = float(payload.get("duration", 10.0))
+            interval = float(payload.get("interval_ms", 5.0)) / 1000
+            self.logger.info("sys.profile.capture.started", duration=duration, interval=interval)
+            sampler = StackSampler(interval=interval, labeler=self.station_manager.thread_labels)
+            profile = await asyncio.to_thread(sampler.capture, duration)
+            await ws.send(json.dumps({
+                "type": "profile.captured",
+                "payload": profile,
+            }))
+            self.logger.info(
+                "sys.profile.capture.completed",
+                samples=profile["samples"],
+                sampler_cpu_ms=profile["sampler_cpu_ms"],
+            )
+        except ConnectionClosed:
+            self.logger.warning("sys.profile.capture.connection_closed")
+        except Exception:
+            self.logger.exception("sys.profile.capture.failed")
+
 
 async def main():
     client = HeadlessClient(base_url="https://stg.scaleledger.intedges.com")
@@ -1,31 +1,53 @@
 # managers.py
+from concurrent.futures import Future
 from dataclasses import dataclass
 import threading
-from typing import Callable, Dict
+from typing import Callable, Dict, Literal
 
 from structlog.stdlib import get_logger
 
 from cache import MarketDataCache
-from events import BaseEvent, RFIDTaggedEvent, WeighingCompletedEvent
+from engine import MultiplexedSerialEngine
+from events import BaseEvent, PrintJobQueuedEvent, RFIDTaggedEvent, WeighingCompletedEvent
 from printer import Receipt, ReceiptTemplate
 from models import WeighingStation
+from resolver import RemoteRFIDResolver
+from spool import PrintSpool
 from suwol1000 import SerialClient, WeighingStationWorker
 
 
 @dataclass
 class StationRuntime:
     worker: WeighingStationWorker
-    thread: threading.Thread
+    thread: threading.Thread | None
     port: str
+    engine: MultiplexedSerialEngine | None = None
 
 
 class WeighingStationManager:
-    def __init__(self, on_event: Callable[[BaseEvent], None], market_cache: MarketDataCache):
+    def __init__(
+        self,
+        on_event: Callable[[BaseEvent], None],
+        market_cache: MarketDataCache,
+        engine: Literal["thread", "multiplexed"] = "thread",
+        engine_threads: int = 1,
+        rfid_resolver: RemoteRFIDResolver | None = None,
+    ):
         self.on_event = on_event
         self.market_cache = market_cache
+        self.rfid_resolver = rfid_resolver
         self.workers: Dict[int, StationRuntime] = {}
+        # 아직 출력하지 못한 전표: 워커를 (재)시작할 때 해당 계근대의 대기열로 넘긴다
+        self.pending_print_jobs: Dict[int, list[PrintJobQueuedEvent]] = {}
         self.logger = get_logger()
 
+        # "thread": 계근대당 OS 스레드 1개 (기본값, 모든 플랫폼)
+        # "multiplexed": engine_threads 개의 selector 스레드가 전체 계근대를 구동 (POSIX 전용)
+        self.engines = [
+            MultiplexedSerialEngine(name=f"WeighingStationEngine-{i}")
+            for i in range(engine_threads if engine == "multiplexed" else 0)
+        ]
+
     def sync(self, stations: list[WeighingStation]):
         self.logger.info("sys.manager.station.sync_evalutaing", current_count=len(self.workers), target_count=len(stations))
 
@@ -36,6 +58,12 @@ class WeighingStationManager:
         for station_id in to_stop_ids:
             self.stop_worker(station_id)
 
+        # 삭제된 계근대의 전표는 출력할 곳이 없다 (DB 행은 sync_weighing_stations 에서 지운다)
+        for station_id in set(self.pending_print_jobs) - target_ids:
+            dropped = self.pending_print_jobs.pop(station_id)
+            if dropped:
+                self.logger.warning("sys.manager.station.print_jobs_dropped", station_id=station_id, count=len(dropped))
+
         for station in stations:
             if station.id not in self.workers:
                 self.start_worker(station)
@@ -53,18 +81,31 @@ class WeighingStationManager:
                     self.start_worker(station)
         self.logger.info("sys.manager.station.sync_completed", running_workers=len(self.workers))
 
+    def restore_print_jobs(self, jobs: list[PrintJobQueuedEvent]):
+        # print_job 테이블의 전표를 교체가 아니라 합친다: 실행 중이거나 멈추며 대기열을 남긴 계근대는 메모리 쪽이 최신
+        # (추가/완료 이벤트가 아직 EventTransport 에 남아 있으면 DB 행으로 덮을 때 전표를 잃거나 출력한 전표를 다시 찍는다)
+        known = {job.uuid for queued in self.pending_print_jobs.values() for job in queued}
+        for job in jobs:
+            if job.station_id in self.workers or job.station_id in self.pending_print_jobs or job.uuid in known:
+                continue
+            self.pending_print_jobs.setdefault(job.station_id, []).append(job)
+
     def start_worker(self, station: WeighingStation):
         self.logger.info("sys.manager.station.start", station_id=station.id, port=station.serial_port)
         
-        def validate_rfid(event: RFIDTaggedEvent) -> bool:
+        def validate_rfid(event: RFIDTaggedEvent) -> bool | Future:
             info = self.market_cache.get_rfid_info(event.rfid_card_uid)
-            if not info:
+            if info:
+                return info.is_active
+            if self.rfid_resolver is None:
                 return False
-            return info.is_active
+            # 최근 발급되어 아직 동기화되지 않은 카드일 수 있으므로 서버에 확인
+            return self.rfid_resolver.resolve(event.rfid_card_uid)
 
         def build_receipt(event: WeighingCompletedEvent) -> bytes | None:
             info = self.market_cache.get_rfid_info(event.rfid_card_uid)
             if not info:
+                self.logger.warning("hw.printer.receipt.card_missing", station_id=station.id, rfid_card_uid=event.rfid_card_uid)
                 return None
                 
             receipt = Receipt(
@@ -79,22 +120,78 @@ class WeighingStationManager:
             )
             return ReceiptTemplate.render(receipt)
 
+        def prepare_receipt(event: RFIDTaggedEvent) -> Callable[[WeighingCompletedEvent], bytes] | None:
+            # 계량하는 동안 카드 정보까지 렌더링해 둔다
+            # 원격 조회로 통과한 카드도 판정 전에 RemoteRFIDResolver 가 캐시에 넣어 두므로 여기서 찾을 수 있다
+            info = self.market_cache.get_rfid_info(event.rfid_card_uid)
+            if not info:
+                return None
+
+            template = ReceiptTemplate.compile(self.market_cache.gateway_name, station.name).bind(
+                producer_name=info.producer_name,
+                species_name=info.species_name,
+                rfid_card_uid=event.rfid_card_uid,
+            )
+            return lambda completed: template.render(
+                measured_at=completed.timestamp,
+                record_uuid=completed.uuid,
+                weight=completed.weight,
+            )
+
         worker = WeighingStationWorker(
             serial_client=SerialClient(port=station.serial_port),
             on_event=self.on_event,
             rfid_validator=validate_rfid,
-            receipt_builder=build_receipt
+            receipt_builder=build_receipt,
+            receipt_preparer=prepare_receipt,
+            print_spool=PrintSpool(
+                station_id=station.id,
+                on_event=self.on_event,
+                jobs=self.pending_print_jobs.pop(station.id, ()),
+            ),
         )
 
-        thread = threading.Thread(target=worker.run, name=f"WeighingStation-{station.id}-{station.serial_port}", daemon=True)
+        name = f"WeighingStation-{station.id}-{station.serial_port}"
+        if self.engines:
+            engine = min(self.engines, key=len)
+            engine.attach(worker, name=name)
+            self.workers[station.id] = StationRuntime(worker=worker, thread=None, port=station.serial_port, engine=engine)
+            return
+
+        thread = threading.Thread(target=worker.run, name=name, daemon=True)
         thread.start()
         self.workers[station.id] = StationRuntime(worker=worker, thread=thread, port=station.serial_port)
 
     def stop_worker(self, station_id: int):
         runtime = self.workers.pop(station_id)
         self.logger.info("sys.manager.station.stop_worker", station_id=station_id, port=runtime.port)
-        runtime.worker.stop()
-        runtime.thread.join(timeout=3.0)
+        if runtime.engine is not None:
+            runtime.engine.detach(runtime.worker, timeout=3.0)
+        else:
+            runtime.worker.stop()
+            runtime.thread.join(timeout=3.0)
+
+        self.pending_print_jobs[station_id] = list(runtime.worker.print_spool.jobs)
+
+    def station_stats(self) -> Dict[int, dict]:
+        return {
+            station_id: {
+                "port": runtime.port,
+                "state": runtime.worker.state.name,
+                **runtime.worker.scheduler.stats(),
+                "frames": runtime.worker.client.framer.frames,
+                "resyncs": runtime.worker.client.framer.resyncs,
+                "print_queue": len(runtime.worker.print_spool),
+                "printed": runtime.worker.print_spool.completed,
+            }
+            for station_id, runtime in list(self.workers.items())
+        }
+
+    def thread_labels(self) -> Dict[int, str]:
+        labels = {}
+        for engine in self.engines:
+            labels.update(engine.thread_labels())
+        return labels
 
     def stop_all(self):
         self.logger.info("sys.manager.station.stop_all.requested")
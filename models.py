@@ -1,4 +1,6 @@
 # models.py
+from enum import StrEnum
+
 from tortoise.models import Model
 from tortoise import fields
 
@@ -44,7 +46,7 @@ class Record(Model):
     uuid = fields.UUIDField(pk=True)
     rfid_card_uid = fields.CharField(max_length=20)
     weight = fields.IntField()
-    measured_at = fields.DatetimeField()
+    measured_at = fields.DatetimeField(db_index=True)
 
     class Meta:
         table = "record"
@@ -53,6 +55,57 @@ class Record(Model):
         return f"<Record(rfid_card_uid={self.rfid_card_uid}, weight={self.weight}, measured_at={self.measured_at})>"
 
 
+class OutboxStatus(StrEnum):
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    REJECTED = "rejected"
+
+
+class UploadOutbox(Model):
+    id = fields.IntField(pk=True)
+    record = fields.OneToOneField("models.Record", related_name="outbox", on_delete=fields.CASCADE)
+    status = fields.CharEnumField(OutboxStatus, max_length=16, default=OutboxStatus.PENDING)
+    attempts = fields.IntField(default=0)
+    next_attempt_at = fields.DatetimeField()
+    last_error = fields.TextField(null=True)
+
+    class Meta:
+        table = "upload_outbox"
+        indexes = (("status", "next_attempt_at"),)
+
+    def __repr__(self):
+        return f"<UploadOutbox(record_id={self.record_id}, status={self.status}, attempts={self.attempts})>"
+
+
+class PrintJob(Model):
+    # 아직 프린터로 보내지 못한 전표: 전송이 확인되면 지운다 (재시작 시 계근대별 대기열로 복원)
+    uuid = fields.UUIDField(pk=True)
+    station_id = fields.IntField()
+    record_uuid = fields.UUIDField()
+    document = fields.BinaryField()
+    created_at = fields.DatetimeField()
+
+    class Meta:
+        table = "print_job"
+        indexes = (("station_id", "created_at"),)
+
+    def __repr__(self):
+        return f"<PrintJob(station_id={self.station_id}, record_uuid={self.record_uuid}, size={len(self.document)})>"
+
+
+class SyncState(Model):
+    resource = fields.CharField(max_length=50, pk=True)
+    gateway_id = fields.IntField()
+    high_water = fields.CharField(max_length=64)
+    synced_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "sync_state"
+
+    def __repr__(self):
+        return f"<SyncState(resource={self.resource}, high_water={self.high_water})>"
+
+
 class Species(Model):
     id = fields.IntField(pk=True)
     name = fields.CharField(max_length=100)
@@ -3,7 +3,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 from enum import StrEnum
-from typing import Self
+import functools
+from typing import Any, Callable, Self
 import uuid
 
 
@@ -116,12 +117,7 @@ class EscPosBuilder:
         return self
     
     def add_kv(self, key: str, value: str, max_col: int = 42) -> Self:
-        k_bytes = len(key.encode("cp949", errors="replace"))
-        v_bytes = len(value.encode("cp949", errors="replace"))
-        spaces = max(1, max_col - k_bytes - v_bytes)
-        
-        line = f"{key}{' ' * spaces}{value}"
-        self.add_text(line).feed_lines(1)
+        self._buffer.extend(_render_kv(_encode_text(key), value, max_col))
         return self
 
     def feed_lines(self, lines: int = 1, now: bool = False) -> Self:
@@ -159,6 +155,82 @@ class EscPosBuilder:
         return bytes(self._buffer)
 
 
+@functools.lru_cache(maxsize=4096)
+def _encode_cp949(text: str) -> bytes:
+    return text.encode("cp949", errors="replace")
+
+
+def _encode_text(text: str) -> bytes:
+    # cp949 는 ASCII 호환: 시각/전표번호/카드번호는 캐시를 거치지 않고, 생산자명/품목명 같은 한글만 캐시
+    if text.isascii():
+        return text.encode()
+    return _encode_cp949(text)
+
+
+def _render_kv(key_bytes: bytes, value: str, max_col: int) -> bytes:
+    value_bytes = _encode_text(value)
+    spaces = max(1, max_col - len(key_bytes) - len(value_bytes))
+    return key_bytes + b" " * spaces + value_bytes + EscPosCommand.LINE_FEED
+
+
+@dataclass(frozen=True)
+class TemplateSlot:
+    name: str
+    render: Callable[[Any], bytes]
+
+
+class CompiledTemplate:
+    # 고정 바이트 조각과 값 슬롯의 나열: 렌더링은 슬롯만 인코딩해 이어 붙인다
+    def __init__(self, parts: list[bytes | TemplateSlot]):
+        self.parts = parts
+
+    @property
+    def slots(self) -> list[str]:
+        return [part.name for part in self.parts if isinstance(part, TemplateSlot)]
+
+    def bind(self, **values: Any) -> "CompiledTemplate":
+        # 미리 아는 값은 바이트로 굳혀 이웃한 고정 조각과 합친다
+        parts: list[bytes | TemplateSlot] = []
+        for part in self.parts:
+            if isinstance(part, TemplateSlot) and part.name in values:
+                part = part.render(values[part.name])
+            if isinstance(part, bytes) and parts and isinstance(parts[-1], bytes):
+                parts[-1] += part
+            else:
+                parts.append(part)
+        return CompiledTemplate(parts)
+
+    def render(self, **values: Any) -> bytes:
+        return b"".join(
+            part if isinstance(part, bytes) else part.render(values[part.name])
+            for part in self.parts
+        )
+
+
+class EscPosTemplateBuilder(EscPosBuilder):
+    # EscPosBuilder 와 같은 체인으로 양식을 그리고, 계량마다 바뀌는 값 자리에만 슬롯을 둔다
+    def __init__(self):
+        super().__init__()
+        self._parts: list[bytes | TemplateSlot] = []
+
+    def _add_slot(self, name: str, render: Callable[[Any], bytes]) -> Self:
+        if self._buffer:
+            self._parts.append(bytes(self._buffer))
+            self._buffer.clear()
+        self._parts.append(TemplateSlot(name=name, render=render))
+        return self
+
+    def add_text_slot(self, name: str, format: Callable[[Any], str] = str) -> Self:
+        return self._add_slot(name, lambda value: _encode_text(format(value)))
+
+    def add_kv_slot(self, key: str, name: str, format: Callable[[Any], str] = str, max_col: int = 42) -> Self:
+        key_bytes = _encode_text(key)
+        return self._add_slot(name, lambda value: _render_kv(key_bytes, format(value), max_col))
+
+    def compile(self) -> CompiledTemplate:
+        return CompiledTemplate([*self._parts, bytes(self._buffer)]).bind()
+
+
 @dataclass(frozen=True)
 class Receipt:
     record_uuid: uuid.UUID
@@ -173,11 +245,11 @@ class Receipt:
 
 class ReceiptTemplate:
     @staticmethod
-    def render(receipt: Receipt) -> bytes:
-        short_uuid = str(receipt.record_uuid).split("-")[0].upper()
-
-        builder = (
-            EscPosBuilder()
+    @functools.lru_cache(maxsize=64)
+    def compile(gateway_name: str, station_name: str) -> CompiledTemplate:
+        # 계근대마다 한 번만 만든다 (게이트웨이 이름이 바뀌면 새 키로 다시 컴파일)
+        return (
+            EscPosTemplateBuilder()
 
             # Header
             .set_align(Alignment.CENTER)
@@ -187,36 +259,46 @@ class ReceiptTemplate:
             .set_quadruple(False)
             .set_bold(False)
             .feed_lines(2)
-            
+
             # Meta Data
             .set_align(Alignment.LEFT)
             .add_separator("=", 42)
-            .add_kv("발행일시", receipt.measured_at.strftime("%Y-%m-%d %H:%M:%S"))
-            .add_kv("전표번호", short_uuid)
-            .add_kv("계 량 기", receipt.gateway_name)
-            .add_kv("계 근 대", receipt.station_name)
+            .add_kv_slot("발행일시", "measured_at", lambda measured_at: measured_at.strftime("%Y-%m-%d %H:%M:%S"))
+            .add_kv_slot("전표번호", "record_uuid", lambda record_uuid: str(record_uuid).split("-")[0].upper())
+            .add_kv("계 량 기", gateway_name)
+            .add_kv("계 근 대", station_name)
             .add_separator("-", 42)
-            
+
             # Body
-            .add_kv("생산자명", receipt.producer_name)
-            .add_kv("품 목 명", receipt.species_name)
-            .add_kv("카드번호", receipt.rfid_card_uid)
-            
+            .add_kv_slot("생산자명", "producer_name")
+            .add_kv_slot("품 목 명", "species_name")
+            .add_kv_slot("카드번호", "rfid_card_uid")
+
             # Weight
             .set_align(Alignment.RIGHT)
             .set_quadruple(True)
             .set_bold(True)
-            .add_text(f"{receipt.weight:,} kg")
+            .add_text_slot("weight", lambda weight: f"{weight:,} kg")
             .feed_lines(1)
             .set_quadruple(False)
             .set_bold(False)
-            
+
             # Footer
             .set_align(Alignment.CENTER)
             .add_separator("=", 42)
             .add_text("SUWOL ScaleLedger System")
 
             .cut()
+            .compile()
+        )
+
+    @staticmethod
+    def render(receipt: Receipt) -> bytes:
+        return ReceiptTemplate.compile(receipt.gateway_name, receipt.station_name).render(
+            measured_at=receipt.measured_at,
+            record_uuid=receipt.record_uuid,
+            producer_name=receipt.producer_name,
+            species_name=receipt.species_name,
+            rfid_card_uid=receipt.rfid_card_uid,
+            weight=receipt.weight,
         )
-        
-        return builder.build()
@@ -0,0 +1,91 @@
+# profiler.py
+from collections import Counter
+import os
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import Callable, Dict
+
+
+MIN_DURATION = 0.1
+MAX_DURATION = 60.0
+MIN_INTERVAL = 0.001
+MAX_INTERVAL = 0.1
+
+
+class StackSampler:
+    # 외부 도구 없이 sys._current_frames() 로 전체 스레드 스택을 주기적으로 샘플링
+    # 결과는 flamegraph.pl / speedscope 에 바로 넣을 수 있는 collapsed stack 형식
+    def __init__(
+        self,
+        interval: float = 0.005,
+        max_depth: int = 64,
+        labeler: Callable[[], Dict[int, str]] | None = None,
+    ):
+        self.interval = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+        self.max_depth = max_depth
+        # 스레드 ident -> 라벨 (멀티플렉스 엔진처럼 한 스레드가 여러 계근대를 구동할 때 현재 계근대를 표시)
+        self.labeler = labeler
+        self.code_labels: Dict[CodeType, str] = {}
+
+    def frame_label(self, code: CodeType) -> str:
+        label = self.code_labels.get(code)
+        if label is None:
+            label = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self.code_labels[code] = label
+        return label
+
+    def collapse(self, frame: FrameType | None) -> str:
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(self.frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+    def capture(self, duration: float) -> dict:
+        duration = min(max(duration, MIN_DURATION), MAX_DURATION)
+        own_ident = threading.get_ident()
+        stacks: Counter[str] = Counter()
+        threads: Counter[str] = Counter()
+        samples = 0
+
+        cpu_start = time.thread_time()
+        started_at = time.monotonic()
+        deadline = started_at + duration
+        next_sample = started_at
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+                continue
+            next_sample += self.interval
+            if next_sample < now:
+                # 샘플링이 밀리면 몰아서 찍지 않고 현재 시각 기준으로 다시 맞춘다
+                next_sample = now + self.interval
+
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            if self.labeler is not None:
+                names.update(self.labeler())
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                name = names.get(ident, f"Thread-{ident}")
+                stacks[f"{name};{self.collapse(frame)}"] += 1
+                threads[name] += 1
+            del frames
+            samples += 1
+
+        elapsed = time.monotonic() - started_at
+        return {
+            "duration": round(elapsed, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": samples,
+            "sampler_cpu_ms": round((time.thread_time() - cpu_start) * 1000, 1),
+            "threads": dict(threads),
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()),
+        }
@@ -0,0 +1,131 @@
+# resolver.py
+import asyncio
+from concurrent.futures import Future
+import threading
+import time
+from typing import Awaitable, Callable, Dict
+
+import httpx
+from structlog.stdlib import get_logger
+
+from api import APIClient
+from cache import MarketDataCache
+
+
+def resolved(value: bool) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class RemoteRFIDResolver:
+    # 로컬 캐시에 없는 uid 를 계근대 스레드에서 서버에 물어본다 (요청은 메인 루프에서 실행)
+    # - budget: "잠시만 기다려주십시오" 안내 음성(약 1.5초) 안에 끝나도록 요청 전체에 거는 제한 시간
+    # - 없는 카드(404)는 negative_ttl 동안 다시 묻지 않는다
+    # - 여러 계근대가 같은 uid 를 동시에 물으면 요청 하나를 함께 기다린다
+    # - 찾은 카드는 판정을 돌려주기 전에 캐시에 덧씌운다: 통과 직후 전표를 만들 때 생산자/어종 이름을 읽을 수 있도록
+    def __init__(
+        self,
+        api_client: APIClient,
+        market_cache: MarketDataCache,
+        access_token: Callable[[], str | None],
+        on_card: Callable[[dict], Awaitable[None]],
+        budget: float = 1.2,
+        negative_ttl: float = 60.0,
+    ):
+        self.api_client = api_client
+        self.market_cache = market_cache
+        self.access_token = access_token
+        self.on_card = on_card
+        self.budget = budget
+        self.negative_ttl = negative_ttl
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+        self.lock = threading.Lock()
+        self.in_flight: Dict[str, Future] = {}
+        self.unknown_until: Dict[str, float] = {}
+        self.saving: set[asyncio.Task] = set()
+        self.requests = 0
+        self.merged = 0
+        self.negative_hits = 0
+        self.logger = get_logger()
+
+    def resolve(self, uid: str) -> Future:
+        # 계근대 스레드에서 호출: 막지 않고 Future 를 돌려준다 (True = 활성 카드)
+        with self.lock:
+            expires_at = self.unknown_until.get(uid)
+            if expires_at is not None:
+                if time.monotonic() < expires_at:
+                    self.negative_hits += 1
+                    return resolved(False)
+                del self.unknown_until[uid]
+
+            future = self.in_flight.get(uid)
+            if future is not None:
+                self.merged += 1
+                return future
+
+            if self.loop is None or self.loop.is_closed() or self.access_token() is None:
+                return resolved(False)
+
+            future = asyncio.run_coroutine_threadsafe(self.lookup(uid), self.loop)
+            self.in_flight[uid] = future
+            self.requests += 1
+        future.add_done_callback(lambda _: self.finish(uid))
+        return future
+
+    def finish(self, uid: str):
+        with self.lock:
+            self.in_flight.pop(uid, None)
+
+    def forget(self, uid: str):
+        # 서버가 카드를 새로 발급했다고 알려오면 negative 캐시를 지운다
+        with self.lock:
+            self.unknown_until.pop(uid, None)
+
+    async def lookup(self, uid: str) -> bool:
+        started_at = time.monotonic()
+        try:
+            async with asyncio.timeout(self.budget):
+                card = await self.api_client.fetch_rfid_card(self.access_token(), uid)
+        except TimeoutError:
+            self.logger.warning("net.api.rfid_resolve.timeout", rfid_card_uid=uid, budget=self.budget)
+            return False
+        except httpx.HTTPStatusError as e:
+            self.logger.warning("net.api.rfid_resolve.server_error", rfid_card_uid=uid, status=e.response.status_code)
+            return False
+        except httpx.RequestError:
+            self.logger.warning("net.api.rfid_resolve.network_error", rfid_card_uid=uid)
+            return False
+
+        elapsed_ms = round((time.monotonic() - started_at) * 1000, 1)
+        if card is None:
+            with self.lock:
+                self.unknown_until[uid] = time.monotonic() + self.negative_ttl
+            self.logger.info("net.api.rfid_resolve.unknown", rfid_card_uid=uid, elapsed_ms=elapsed_ms)
+            return False
+
+        self.logger.info(
+            "net.api.rfid_resolve.found",
+            rfid_card_uid=uid,
+            is_active=card["is_active"],
+            elapsed_ms=elapsed_ms,
+        )
+        patched = self.market_cache.patch(
+            lambda snapshot: snapshot.upsert_card(card["uid"], card["is_active"], card["producer"], card["species"])
+        )
+        if not patched:
+            # 캐시에 아직 없는 생산자/어종: 계량은 진행하지만 전표에 쓸 이름이 없다
+            self.logger.warning("net.api.rfid_resolve.parent_missing", rfid_card_uid=uid)
+        # 판정은 SQLite 저장을 기다리게 하지 않는다
+        task = asyncio.create_task(self.on_card(card))
+        self.saving.add(task)
+        task.add_done_callback(self.saving.discard)
+        return bool(card["is_active"])
+
+    def stats(self) -> dict:
+        return {
+            "rfid_resolve_requests": self.requests,
+            "rfid_resolve_merged": self.merged,
+            "rfid_resolve_negative_hits": self.negative_hits,
+        }
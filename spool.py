@@ -0,0 +1,39 @@
+# spool.py
+from collections import deque
+from typing import Callable, Iterable
+
+from events import BaseEvent, PrintJobCompletedEvent, PrintJobQueuedEvent
+
+
+class PrintSpool:
+    # 계근대별 출력 대기열: 해당 계근대 워커만 접근한다
+    # 추가/완료는 이벤트로 메인 루프에 넘겨 SQLite(print_job)에 남기고, 재시작 시 jobs 로 복원
+    def __init__(
+        self,
+        station_id: int | None = None,
+        on_event: Callable[[BaseEvent], None] | None = None,
+        jobs: Iterable[PrintJobQueuedEvent] = (),
+    ):
+        self.station_id = station_id
+        self.on_event = on_event
+        self.jobs: deque[PrintJobQueuedEvent] = deque(jobs)
+        self.completed = 0
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def submit(self, record_uuid: str, document: bytes) -> PrintJobQueuedEvent:
+        job = PrintJobQueuedEvent(station_id=self.station_id, record_uuid=record_uuid, document=document)
+        self.jobs.append(job)
+        if self.on_event is not None:
+            self.on_event(job)
+        return job
+
+    def peek(self) -> PrintJobQueuedEvent | None:
+        return self.jobs[0] if self.jobs else None
+
+    def complete(self, job: PrintJobQueuedEvent):
+        self.jobs.remove(job)
+        self.completed += 1
+        if self.on_event is not None:
+            self.on_event(PrintJobCompletedEvent(station_id=self.station_id, job_uuid=job.uuid))
@@ -0,0 +1,46 @@
+# storage.py
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    # 연결 시 PRAGMA 로 적용 (tortoise sqlite 클라이언트는 credentials 의 추가 키를 PRAGMA 로 실행)
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"    # WAL 에서는 전원 차단 시 마지막 커밋 일부만 잃을 수 있고 DB 손상은 없음
+    cache_size: int = -16384       # 음수는 KiB 단위: 16 MiB
+    mmap_size: int = 64 * 1024 * 1024
+    temp_store: str = "MEMORY"
+    journal_size_limit: int = 16 * 1024 * 1024
+    foreign_keys: str = "ON"
+
+    def pragmas(self) -> dict:
+        return asdict(self)
+
+    def tortoise_config(self, file_path: str) -> dict:
+        return {
+            "connections": {
+                "default": {
+                    "engine": "tortoise.backends.sqlite",
+                    "credentials": {"file_path": file_path, **self.pragmas()},
+                },
+            },
+            "apps": {
+                "models": {"models": ["models"], "default_connection": "default"},
+            },
+        }
+
+
+STORAGE_PROFILES = {
+    # SQLite 기본값: rollback journal, 커밋마다 fsync, 2 MiB 캐시, mmap 미사용
+    "sqlite_default": StorageProfile(
+        journal_mode="DELETE",
+        synchronous="FULL",
+        cache_size=-2000,
+        mmap_size=0,
+        temp_store="DEFAULT",
+        journal_size_limit=-1,
+    ),
+    # WAL 이지만 커밋마다 fsync
+    "durable": StorageProfile(synchronous="FULL"),
+    "performance": StorageProfile(),
+}
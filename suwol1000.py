@@ -1,23 +1,31 @@
 # suwol1000.py
 from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from concurrent.futures import Future
 from dataclasses import dataclass
 import dataclasses
 from decimal import Decimal
 from enum import auto, Enum, IntEnum, StrEnum, IntFlag
-from typing import Callable, ClassVar, Literal
+import functools
+from typing import Callable, ClassVar, Generator, Literal
 
 import threading
+import time
 
 import serial
 import structlog
 from structlog.stdlib import get_logger
 
-from events import BaseEvent, RFIDTaggedEvent, WeighingCompletedEvent
+from events import BaseEvent, PrintJobQueuedEvent, RFIDTaggedEvent, WeighingCompletedEvent
+from spool import PrintSpool
 
 
 STX = 2
 ETX = 3
 
+RESPONSE_LENGTH = 53
+
 
 class CommandCode(StrEnum):
     DISPLAY = "D"      # 기본 표시 및 제어
@@ -101,53 +109,67 @@ class DisplayRequestPacket(RequestPacket):
     voice_code: VoiceCode = VoiceCode.NONE
 
     def to_bytes(self) -> bytes:
-        device_id = str(self.device_id)
-
-        command_code = self.command_code
-
-        # sign = "-" if self.display_weight.is_signed() else "+"
-        # abs_weight = str(abs(self.display_weight))
-        # display_weight_bytes = f"{sign}{abs_weight:>7.7}".encode()  # 8 bytes
-
-        # 아래 유효숫자 기반 표현형이 깔끔하지만 절대값이 999999보다 커지면 exponent 포함되며 8바이트 초과되니 주의
-        display_weight_bytes = f"{self.display_weight:=+8.6}".encode()  # 8 bytes
-        display_plate_bytes = f"{self.display_plate[-6:]:>6}".encode()  # 6 bytes
-
-        reserved1_bytes = b"000000"  # 6 bytes
-
-        relay_value = (
-            RelayCode.GREEN * self.green_blink |
-            RelayCode.RED * self.red_blink |
-            RelayCode.RELAY3 * False |
-            RelayCode.FAN * False |
-            RelayCode.HEATER * False |
-            RelayCode.RELAY6 * False |
-            RelayCode.RELAY7 * False |
-            RelayCode.RELAY8 * False
-        )
-
-        # *주의* hex 표현 아님: 0, 1, ..., 9, A, B, C, D, E, F
-        # ascii 코드 순서 형태: 0, 1, ..., 9, :, ;, <, =, >, ?
-        high_nibble = (relay_value & 0b11110000) >> 4
-        low_nibble  = (relay_value & 0b00001111)
-        relay_bytes = bytes([high_nibble + ord("0"), low_nibble + ord("0")])  # 2 bytes
-
-        voice_index_bytes = f"{self.voice_code:02d}".encode()  # 2 bytes
-
-        reserved2_bytes = b"0000"  # 4 bytes
-
-        return bytes([
-            STX,                    # 1 byte
-            ord(device_id),         # 1 byte
-            ord(command_code),      # 1 byte
-            *display_weight_bytes,  # 8 bytes
-            *display_plate_bytes,   # 6 bytes
-            *reserved1_bytes,       # 6 bytes
-            *relay_bytes,           # 2 bytes
-            *voice_index_bytes,     # 2 bytes
-            *reserved2_bytes,       # 4 bytes
-            ETX,                    # 1 byte
-        ])
+        display_plate = self.display_plate[-6:]
+        relay_value = int(RelayCode.GREEN * self.green_blink | RelayCode.RED * self.red_blink)
+        voice_code = int(self.voice_code)
+
+        # IDLE 폴링은 같은 프레임을 반복 전송하므로 인코딩 결과를 캐시해서 같은 bytes 객체를 재사용
+        # *주의* Decimal("12.5") == Decimal("12.50") 이지만 표시 문자열이 다르므로 as_tuple()로 키 구분
+        key = (self.device_id, self.display_weight.as_tuple(), display_plate, relay_value, voice_code)
+        frame = _display_frame_cache.get(key)
+        if frame is None:
+            frame = _encode_display_frame(self.device_id, self.display_weight, display_plate, relay_value, voice_code)
+            with _display_frame_cache_lock:
+                if len(_display_frame_cache) >= DISPLAY_FRAME_CACHE_SIZE:
+                    _display_frame_cache.pop(next(iter(_display_frame_cache)), None)
+                _display_frame_cache[key] = frame
+        return frame
+
+
+DISPLAY_FRAME_CACHE_SIZE = 256
+
+_display_frame_cache: dict[tuple, bytes] = {}
+_display_frame_cache_lock = threading.Lock()
+
+_DISPLAY_FRAME_TEMPLATE = bytes([
+    STX,
+    ord("0"),                   # ID
+    ord(CommandCode.DISPLAY),   # CMD
+    *b"+    0.0",               # 중량표시 (8 bytes)
+    *b"      ",                 # 차량번호 (6 bytes)
+    *b"000000",                 # Reserved (6 bytes)
+    *b"00",                     # Relay (2 bytes)
+    *b"00",                     # 음성 (2 bytes)
+    *b"0000",                   # Reserved (4 bytes)
+    ETX,
+])
+
+
+def _encode_display_frame(
+    device_id: int,
+    display_weight: Decimal,
+    display_plate: str,
+    relay_value: int,
+    voice_code: int,
+) -> bytes:
+    # 아래 유효숫자 기반 표현형이 깔끔하지만 절대값이 999999보다 커지면 exponent 포함되며 8바이트 초과되니 주의
+    display_weight_bytes = f"{display_weight:=+8.6}".encode()  # 8 bytes
+    display_plate_bytes = f"{display_plate:>6}".encode()  # 6 bytes
+
+    # *주의* hex 표현 아님: 0, 1, ..., 9, A, B, C, D, E, F
+    # ascii 코드 순서 형태: 0, 1, ..., 9, :, ;, <, =, >, ?
+    high_nibble = (relay_value & 0b11110000) >> 4
+    low_nibble  = (relay_value & 0b00001111)
+
+    # 템플릿을 복사해서 뒤쪽 필드부터 덮어씀 (앞쪽 필드 길이가 틀어져도 오프셋 유지)
+    frame = bytearray(_DISPLAY_FRAME_TEMPLATE)
+    frame[25:27] = f"{voice_code:02d}".encode()  # 2 bytes
+    frame[23] = high_nibble + ord("0")
+    frame[24] = low_nibble + ord("0")
+    frame[11:17] = display_plate_bytes
+    frame[3:11] = display_weight_bytes
+    frame[1] = ord(str(device_id))
+    return bytes(frame)
 
 
 @dataclass(frozen=True)
@@ -205,7 +227,7 @@ class ResponsePacket:
 
     @classmethod
     def from_bytes(cls, raw: bytes) -> "ResponsePacket":
-        if len(raw) != 53:
+        if len(raw) != RESPONSE_LENGTH:
             raise ValueError(f"Invalid response packet length: {len(raw)} bytes")
         if raw[0] != STX or raw[-1] != ETX:
             raise ValueError("Invalid STX/ETX")
@@ -278,12 +300,273 @@ class ResponsePacket:
         )
 
 
+# 2바이트 ASCII 필드는 (b0 << 8 | b1) 정수 키로 조회 -> 슬라이스/디코드 없이 enum 매핑
+def _pair(text: str) -> int:
+    return ord(text[0]) << 8 | ord(text[1])
+
+
+_COMMAND_CODES = {ord(code): code for code in CommandCode}
+_INPUT_CODES = {ord(code): code for code in InputCode}
+_VOICE_CODES = {_pair(f"{code:02d}"): code for code in VoiceCode}
+_PRINTER_STATUSES = {ord(str(status.value)): status for status in PrinterStatus}
+_WEIGHT_STATUSES = {_pair(status): status for status in WeightStatus}
+_WEIGHT_TYPES = {_pair(weight_type): weight_type for weight_type in WeightType}
+_RELAY_CODES = tuple(RelayCode(value) for value in range(256))
+
+
+@functools.lru_cache(maxsize=1024)
+def _decode_weight(field: bytes) -> Decimal:
+    # field = 부호(1) + 중량(7), 예: b"+12345.6"
+    sign = field[:1].decode(errors="replace")
+    abs_weight = field[1:].decode(errors="replace").strip()
+    return Decimal(f"{sign}{abs_weight}")
+
+
+@functools.lru_cache(maxsize=1024)
+def _decode_weight_fixed(field: bytes) -> tuple[int, int]:
+    value = _decode_weight(field)
+    if not value.is_finite():
+        raise ValueError(f"Invalid weight value: {field!r}")
+    decimals = max(0, -value.as_tuple().exponent)
+    return int(value.scaleb(decimals)), decimals
+
+
+# ResponsePacket.from_bytes 와 동일한 값을 돌려주되, 프레임 경계만 먼저 검증하고
+# 각 필드는 읽을 때 고정 오프셋에서 디코딩한다 (폴링마다 전체 파싱 X)
+class ResponseFrame:
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+
+    @classmethod
+    def from_bytes(cls, raw: bytes | bytearray | memoryview) -> "ResponseFrame":
+        if len(raw) != RESPONSE_LENGTH:
+            raise ValueError(f"Invalid response packet length: {len(raw)} bytes")
+        if raw[0] != STX or raw[-1] != ETX:
+            raise ValueError("Invalid STX/ETX")
+        return cls(raw if isinstance(raw, bytes) else bytes(raw))
+
+    @property
+    def device_id(self) -> int:
+        value = self.raw[1] - 0x30
+        if 0 <= value <= 9:
+            return value
+        return int(self.raw[1:2])
+
+    @property
+    def command_code(self) -> CommandCode:
+        code = _COMMAND_CODES.get(self.raw[2])
+        if code is None:
+            return CommandCode(self.raw[2:3].decode(errors="replace"))
+        return code
+
+    @property
+    def rfid_card_uid(self) -> str:
+        return self.raw[3:11].decode(errors="replace")
+
+    @property
+    def has_rfid_card(self) -> bool:
+        return self.raw[3:11] != b"00000000"
+
+    @property
+    def user_command_code(self) -> InputCode:
+        code = _INPUT_CODES.get(self.raw[11])
+        if code is None:
+            return InputCode(self.raw[11:12].decode(errors="replace"))
+        return code
+
+    @property
+    def user_input(self) -> str:
+        return self.raw[12:18].decode(errors="replace")
+
+    @property
+    def relay_value(self) -> int:
+        # *주의* hex 표현 아님: 0, 1, ..., 9, :, ;, <, =, >, ?
+        return ((self.raw[18] - 0x30) << 4) | (self.raw[19] - 0x30)
+
+    @property
+    def relay_code(self) -> RelayCode:
+        relay_value = self.relay_value
+        if 0 <= relay_value < 256:
+            return _RELAY_CODES[relay_value]
+        return RelayCode(relay_value)
+
+    @property
+    def green_blink(self) -> bool:
+        return RelayCode.GREEN in self.relay_code
+
+    @property
+    def red_blink(self) -> bool:
+        return RelayCode.RED in self.relay_code
+
+    @property
+    def fan_on(self) -> bool:
+        return RelayCode.FAN in self.relay_code
+
+    @property
+    def heater_on(self) -> bool:
+        return RelayCode.HEATER in self.relay_code
+
+    @property
+    def unknown_input(self) -> str:
+        return self.raw[20:22].decode(errors="replace")
+
+    @property
+    def voice_code(self) -> VoiceCode:
+        code = _VOICE_CODES.get(self.raw[22] << 8 | self.raw[23])
+        if code is None:
+            return VoiceCode(int(self.raw[22:24]))
+        return code
+
+    @property
+    def inner_temperature(self) -> int:
+        return int(self.raw[24:27])
+
+    @property
+    def fan_trigger_temp(self) -> int:
+        return int(self.raw[27:29])
+
+    @property
+    def heater_trigger_temp(self) -> int:
+        return int(self.raw[29:31])
+
+    @property
+    def printer_status(self) -> PrinterStatus:
+        status = _PRINTER_STATUSES.get(self.raw[31])
+        if status is None:
+            return PrinterStatus(int(self.raw[31:32]))
+        return status
+
+    @property
+    def reserved(self) -> str:
+        return self.raw[32:36].decode(errors="replace")
+
+    @property
+    def weight_status(self) -> WeightStatus:
+        status = _WEIGHT_STATUSES.get(self.raw[36] << 8 | self.raw[37])
+        if status is None:
+            return WeightStatus(self.raw[36:38].decode(errors="replace"))
+        return status
+
+    @property
+    def weight_type(self) -> WeightType:
+        weight_type = _WEIGHT_TYPES.get(self.raw[39] << 8 | self.raw[40])
+        if weight_type is None:
+            return WeightType(self.raw[39:41].decode(errors="replace"))
+        return weight_type
+
+    @property
+    def weight_value(self) -> Decimal:
+        return _decode_weight(self.raw[42:50])
+
+    @property
+    def weight_fixed(self) -> int:
+        # weight_value == weight_fixed / 10 ** weight_decimals
+        return _decode_weight_fixed(self.raw[42:50])[0]
+
+    @property
+    def weight_decimals(self) -> int:
+        return _decode_weight_fixed(self.raw[42:50])[1]
+
+    @property
+    def weight_unit(self) -> str:
+        return self.raw[50:52].decode(errors="replace")
+
+    def to_packet(self) -> ResponsePacket:
+        return ResponsePacket(
+            device_id=self.device_id,
+            command_code=self.command_code,
+            rfid_card_uid=self.rfid_card_uid,
+            user_command_code=self.user_command_code,
+            user_input=self.user_input,
+            green_blink=self.green_blink,
+            red_blink=self.red_blink,
+            fan_on=self.fan_on,
+            heater_on=self.heater_on,
+            unknown_input=self.unknown_input,
+            voice_code=self.voice_code,
+            inner_temperature=self.inner_temperature,
+            fan_trigger_temp=self.fan_trigger_temp,
+            heater_trigger_temp=self.heater_trigger_temp,
+            printer_status=self.printer_status,
+            weight_status=self.weight_status,
+            weight_type=self.weight_type,
+            weight_value=self.weight_value,
+            weight_unit=self.weight_unit,
+        )
+
+
+class StreamFramer:
+    # STX 탐색 -> 길이/ETX 검증 후 프레임 추출. 검증 실패 시 해당 STX 만 버리고 다음 STX 에서 재동기화하므로
+    # 노이즈/반쪽 프레임 뒤에 오는 정상 프레임은 잃지 않는다
+    def __init__(self, frame_length: int = RESPONSE_LENGTH):
+        self.frame_length = frame_length
+        self.buffer = bytearray()
+        self.head = 0
+
+        self.frames = 0
+        self.resyncs = 0
+        self.discarded_bytes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self.buffer) - self.head
+
+    def feed(self, data: bytes):
+        if self.head and self.head >= len(self.buffer) // 2:
+            del self.buffer[:self.head]
+            self.head = 0
+        self.buffer.extend(data)
+
+    def next_frame(self) -> bytes | None:
+        buffer = self.buffer
+        while self.pending:
+            start = buffer.find(STX, self.head)
+            if start < 0:
+                self.discard(self.pending)
+                return None
+            self.discard(start - self.head)
+
+            end = start + self.frame_length
+            if end > len(buffer):
+                return None
+            if buffer[end - 1] != ETX:
+                self.discard(1)
+                continue
+
+            frame = bytes(buffer[start:end])
+            self.head = end
+            self.frames += 1
+            if self.head == len(buffer):
+                buffer.clear()
+                self.head = 0
+            return frame
+        return None
+
+    def discard(self, count: int):
+        if count <= 0:
+            return
+        self.head += count
+        self.resyncs += 1
+        self.discarded_bytes += count
+        if self.head == len(self.buffer):
+            self.buffer.clear()
+            self.head = 0
+
+    def clear(self) -> int:
+        stale = self.pending
+        self.discard(stale)
+        return stale
+
+
 class SerialClient:
     def __init__(self, port: str, timeout: float = 1.0, write_timeout: float = 1.0):
         self.port = port
         self.timeout = timeout
         self.write_timeout = write_timeout
         self.serial: serial.Serial | None = None
+        self.framer = StreamFramer()
 
     def connect(self):
         self.serial = serial.Serial(
@@ -305,13 +588,194 @@ class SerialClient:
             except Exception:
                 pass
 
-    def send_and_receive(self, request: RequestPacket) -> ResponsePacket:
+    def send_and_receive(self, request: RequestPacket) -> ResponseFrame:
         if self.serial is None or not self.serial.is_open:
             raise serial.SerialException("Serial port is not connected")
         
+        # 이전 폴링에서 늦게 도착한 응답/잔여 바이트는 이번 요청의 응답이 아니므로 버린다
+        if self.serial.in_waiting:
+            self.framer.feed(self.serial.read(self.serial.in_waiting))
+        self.framer.clear()
+
         self.serial.write(request.to_bytes())
-        response = self.serial.read_until(expected=bytes([ETX]))
-        return ResponsePacket.from_bytes(response)
+
+        received = 0
+        deadline = time.monotonic() + self.timeout
+        while (frame := self.framer.next_frame()) is None:
+            # 응답 1프레임 분량을 받았는데 조립 중인 후보도 없으면 타임아웃까지 기다리지 않는다
+            if received >= RESPONSE_LENGTH and not self.framer.pending:
+                raise ValueError(f"Corrupted response frame: {received} bytes discarded")
+            if time.monotonic() >= deadline:
+                raise ValueError(f"Response timeout: {self.framer.pending} bytes pending")
+            chunk = self.serial.read(max(1, self.serial.in_waiting))
+            if not chunk:
+                raise ValueError(f"Response timeout: {self.framer.pending} bytes pending")
+            received += len(chunk)
+            self.framer.feed(chunk)
+        return ResponseFrame.from_bytes(frame)
+
+
+@dataclass(frozen=True)
+class StabilityRules:
+    window: float = 1.0                  # 편차를 확인할 최근 구간 (초)
+    max_spread: Decimal = Decimal("1.0")  # 구간 내 최대-최소 허용 편차 (kg)
+    min_dwell: float = 0.5               # 조건을 연속으로 만족해야 하는 시간 (초)
+    min_samples: int = 3                 # 편차를 판단하려면 window 안에 있어야 하는 최소 샘플 수
+    timeout: float = 15.0                # 이 시간 내 안정되지 않으면 계량 중단 (초)
+    require_stable_flag: bool = True     # 인디케이터의 ST 플래그 필수 여부
+
+
+class WeightStabilizer:
+    # 최근 중량 샘플을 고정소수점(g) 링 버퍼에 보관하고 StabilityRules 로 확정 여부를 판단
+    def __init__(self, rules: StabilityRules | None = None, capacity: int = 64):
+        self.rules = rules or StabilityRules()
+        self.capacity = capacity
+        self.weights = array("q", bytes(8 * capacity))
+        self.times = array("d", bytes(8 * capacity))
+        self.count = 0
+        self.index = 0
+        self.stable_since: float | None = None
+        self.max_spread = int(self.rules.max_spread * 1000)
+
+    def add(self, now: float, response: ResponseFrame):
+        decimals = response.weight_decimals
+        weight = response.weight_fixed
+        weight = weight * 10 ** (3 - decimals) if decimals <= 3 else weight // 10 ** (decimals - 3)
+
+        self.weights[self.index] = weight
+        self.times[self.index] = now
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        is_flag_ok = response.weight_status == WeightStatus.STABLE or (
+            not self.rules.require_stable_flag and response.weight_status == WeightStatus.UNSTABLE
+        )
+        # 샘플이 하나뿐인 구간은 편차가 0 이라 안정으로 오판하므로 최소 샘플 수를 채운 뒤에만 판단
+        samples, spread = self.spread(now)
+        if not is_flag_ok or samples < self.rules.min_samples or spread > self.max_spread:
+            self.stable_since = None
+        elif self.stable_since is None:
+            self.stable_since = now
+
+    def reset(self):
+        # 거래가 시작되면 대기 중/이전 트럭의 샘플을 버린다
+        self.count = 0
+        self.index = 0
+        self.stable_since = None
+
+    def spread(self, now: float) -> tuple[int, int]:
+        # (window 안의 샘플 수, 최대-최소 편차)
+        lowest = highest = self.weights[(self.index - 1) % self.capacity]
+        samples = 1
+        for offset in range(2, self.count + 1):
+            i = (self.index - offset) % self.capacity
+            if self.times[i] < now - self.rules.window:
+                break
+            lowest = min(lowest, self.weights[i])
+            highest = max(highest, self.weights[i])
+            samples += 1
+        return samples, highest - lowest
+
+    def is_final(self, now: float) -> bool:
+        return self.stable_since is not None and now - self.stable_since >= self.rules.min_dwell
+
+
+class InputBuffer:
+    # MCU 는 태그/키패드 입력을 한 번 읽으면 지운다: 어느 상태의 응답이든 꺼내 수신 시각과 함께 보관
+    # IDLE 이 오래된 것부터 꺼내 쓰고, max_age 가 지난 입력은 떠난 트럭의 것으로 보고 버린다
+    # max_age 는 MCU 보관 시간(3초)에 진행 중인 음성 안내(약 2초)가 끝나 IDLE 로 돌아올 여유만 더한 값
+    # (더 길면 이미 떠난 트럭의 태그가 다음 차량의 무게로 거래를 시작한다)
+    def __init__(self, max_age: float = 5.0, capacity: int = 8):
+        self.max_age = max_age
+        self.tags: deque[tuple[float, str]] = deque(maxlen=capacity)
+        self.keys: deque[tuple[float, InputCode, str]] = deque(maxlen=capacity)
+        self.captured = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self.tags) + len(self.keys)
+
+    def capture(self, now: float, response: "ResponseFrame", ignore_uid: str | None = None) -> bool:
+        captured = False
+        if response.has_rfid_card and response.rfid_card_uid != ignore_uid:
+            self.tags.append((now, response.rfid_card_uid))
+            captured = True
+        if response.user_command_code != InputCode.NONE:
+            self.keys.append((now, response.user_command_code, response.user_input))
+            captured = True
+        self.captured += captured
+        return captured
+
+    def take_tag(self, now: float) -> tuple[float, str] | None:
+        return self.take(self.tags, now)
+
+    def take_key(self, now: float) -> tuple[float, InputCode, str] | None:
+        return self.take(self.keys, now)
+
+    def take(self, entries: deque, now: float):
+        while entries:
+            entry = entries.popleft()
+            if now - entry[0] <= self.max_age:
+                return entry
+            self.expired += 1
+        return None
+
+
+class PollScheduler:
+    # 단조 시계 기준 고정 주기 폴링: 다음 데드라인까지 남은 시간만 대기하고 지연/초과를 기록
+    def __init__(self, interval: float, capacity: int = 512, overrun_tolerance: float = 0.1):
+        self.interval = interval
+        self.overrun_tolerance = interval * overrun_tolerance
+        self.next_deadline: float | None = None
+
+        self.capacity = capacity
+        self.lateness = array("d", bytes(8 * capacity))
+        self.count = 0
+        self.index = 0
+        self.cycles = 0
+        self.overruns = 0
+
+    def reset(self):
+        self.next_deadline = None
+
+    def delay(self, now: float) -> float:
+        if self.next_deadline is None:
+            return 0.0
+        return max(0.0, self.next_deadline - now)
+
+    def begin(self, now: float):
+        deadline = now if self.next_deadline is None else self.next_deadline
+        lateness = now - deadline
+
+        self.lateness[self.index] = lateness
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.cycles += 1
+
+        if lateness > self.overrun_tolerance:
+            # 밀린 주기를 몰아서 보내지 않고 현재 시각 기준으로 다시 맞춘다
+            self.overruns += 1
+            self.next_deadline = now + self.interval
+        else:
+            self.next_deadline = deadline + self.interval
+
+    def stats(self) -> dict:
+        samples = sorted(self.lateness[:self.count]) if self.count < self.capacity else sorted(self.lateness)
+
+        def percentile(q: float) -> float | None:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 3)
+
+        return {
+            "interval_ms": self.interval * 1000,
+            "cycles": self.cycles,
+            "overruns": self.overruns,
+            "jitter_p50_ms": percentile(0.50),
+            "jitter_p95_ms": percentile(0.95),
+            "jitter_p99_ms": percentile(0.99),
+            "jitter_max_ms": round(samples[-1] * 1000, 3) if samples else None,
+        }
 
 
 class WorkerState(Enum):
@@ -324,27 +788,50 @@ class WorkerState(Enum):
     RECOVER = auto()
 
 
+# 상태 핸들러는 제너레이터로 동작: RequestPacket 을 yield 하면 응답(ResponseFrame)을 돌려받고,
+# float 를 yield 하면 해당 시간(초)만큼 대기 후 재개된다. I/O 는 드라이버(run / MultiplexedSerialEngine)가 수행
+WorkerStep = Generator[RequestPacket | float, ResponseFrame | None, WorkerState]
+
+
 class WeighingStationWorker:
     def __init__(
         self,
         serial_client: SerialClient,
         on_event: Callable[[BaseEvent], None] | None = None,
-        rfid_validator: Callable[[RFIDTaggedEvent], bool] | None = None,
+        rfid_validator: Callable[[RFIDTaggedEvent], bool | Future] | None = None,
         receipt_builder: Callable[[WeighingCompletedEvent], bytes | None] | None = None,
+        receipt_preparer: Callable[[RFIDTaggedEvent], Callable[[WeighingCompletedEvent], bytes] | None] | None = None,
         polling_interval: float = 0.1,
         retry_interval: float = 1.0,
+        stability_rules: StabilityRules | None = None,
+        verify_timeout: float = 2.0,
+        print_spool: PrintSpool | None = None,
+        input_max_age: float = 5.0,
     ):
         self.client = serial_client
         self.on_event = on_event or print
+        # bool 또는 원격 조회 중인 Future[bool] 를 돌려준다
         self.rfid_validator = rfid_validator or (lambda _: True)
         self.receipt_builder = receipt_builder
+        # 검증 직후 카드 정보까지 채워 둔 전표: PRINT 에서는 계량 결과만 채운다 (없으면 receipt_builder)
+        self.receipt_preparer = receipt_preparer
+        self.prepared_receipt: Callable[[WeighingCompletedEvent], bytes] | None = None
+        # 전표는 대기열에 넣고 PRINT 를 바로 끝낸다: 실제 전송은 이후 폴링 사이에 (dispatch_print)
+        self.print_spool = print_spool if print_spool is not None else PrintSpool()
+        self.paper_out = False
         self.polling_interval = polling_interval
         self.retry_interval = retry_interval
+        self.verify_timeout = verify_timeout
 
         self.state = WorkerState.INITIALIZE
         self.last_weight = Decimal("0")
         self.last_plate = ""
         self.last_event: BaseEvent | None = None
+        self.stabilizer = WeightStabilizer(stability_rules)
+        self.scheduler = PollScheduler(polling_interval)
+        self.inputs = InputBuffer(max_age=input_max_age)
+        self.transaction_started_at = 0.0
+        self.last_print_job: PrintJobQueuedEvent | None = None
         self.stop_event = threading.Event()
 
         self.logger = get_logger().bind(port=serial_client.port)
@@ -359,44 +846,63 @@ class WeighingStationWorker:
 
         while not self.stop_event.is_set():
             structlog.contextvars.bind_contextvars(state=self.state.name)
+            self.state = self.drive(self.step())
+
+        self.client.disconnect()
+        self.logger.info("sys.worker.terminated")
+
+    def drive(self, steps: WorkerStep) -> WorkerState:
+        result, error = None, None
+        while True:
             try:
-                match self.state:
-                    case WorkerState.INITIALIZE:
-                        self.state = self.initialize()
-                    case WorkerState.CONNECT:
-                        self.state = self.connect()
-                    case WorkerState.IDLE:
-                        self.state = self.idle()
-                    case WorkerState.VERIFY:
-                        self.state = self.verify()
-                    case WorkerState.MEASURE:
-                        self.state = self.measure()
-                    case WorkerState.PRINT:
-                        self.state = self.print()
-                    case WorkerState.RECOVER:
-                        self.state = self.recover()
-            
-            except ValueError:
-                self.logger.exception("hw.protocol.parse_error")
-                self.stop_event.wait(self.polling_interval)
-                self.state = WorkerState.IDLE
+                operation = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+
+            result, error = None, None
+            if isinstance(operation, RequestPacket):
+                try:
+                    result = self.client.send_and_receive(operation)
+                except Exception as e:
+                    error = e
+            else:
+                self.stop_event.wait(operation)
+
+    def step(self) -> WorkerStep:
+        try:
+            match self.state:
+                case WorkerState.INITIALIZE:
+                    return self.initialize()
+                case WorkerState.CONNECT:
+                    return self.connect()
+                case WorkerState.IDLE:
+                    return (yield from self.idle())
+                case WorkerState.VERIFY:
+                    return (yield from self.verify())
+                case WorkerState.MEASURE:
+                    return (yield from self.measure())
+                case WorkerState.PRINT:
+                    return (yield from self.print())
+                case WorkerState.RECOVER:
+                    return (yield from self.recover())
+
+        except ValueError:
+            self.logger.exception("hw.protocol.parse_error")
+            return WorkerState.IDLE
 
-            except serial.SerialTimeoutException:
-                self.logger.exception("hw.serial.timeout")
-                self.state = WorkerState.RECOVER
+        except serial.SerialTimeoutException:
+            self.logger.exception("hw.serial.timeout")
+            return WorkerState.RECOVER
 
-            except serial.SerialException:
-                self.logger.exception("hw.serial.connection_lost")
-                self.state = WorkerState.RECOVER
+        except serial.SerialException:
+            self.logger.exception("hw.serial.connection_lost")
+            return WorkerState.RECOVER
 
-            except Exception:
-                self.logger.exception("sys.worker.unexpected_error")
-                self.state = WorkerState.RECOVER
+        except Exception:
+            self.logger.exception("sys.worker.unexpected_error")
+            return WorkerState.RECOVER
 
-        self.client.disconnect()
-        self.logger.info("sys.worker.terminated")
-    
-    def poll_until_voice_ends(self, base_request: DisplayRequestPacket) -> ResponsePacket | None:
+    def poll_until_voice_ends(self, base_request: DisplayRequestPacket) -> Generator[RequestPacket | float, ResponseFrame | None, ResponseFrame | None]:
         response = None
 
         if base_request.voice_code != VoiceCode.NONE:
@@ -411,15 +917,74 @@ class WeighingStationWorker:
                 voice_code=VoiceCode.NONE if voice_sent else base_request.voice_code,
             )
             try:
-                response = self.client.send_and_receive(request)
-                self.last_weight = response.weight_value
+                response = yield from self.poll(request)
+                self.observe(response)
                 is_speaker_busy = response.voice_code != VoiceCode.NONE
                 voice_sent |= response.voice_code == base_request.voice_code
             except ValueError:
                 self.logger.warning("hw.protocol.parse_error", action="ignore_and_continue")
-            self.stop_event.wait(self.polling_interval)
         return response
 
+    def poll(self, request: RequestPacket) -> Generator[RequestPacket | float, ResponseFrame | None, ResponseFrame]:
+        delay = self.scheduler.delay(time.monotonic())
+        if delay > 0:
+            yield delay
+        self.scheduler.begin(time.monotonic())
+        response = yield request
+        self.capture_input(response)
+        # 계량 중에는 안정 판정용 샘플 간격을 지키기 위해 출력을 미룬다
+        if self.print_spool and isinstance(request, DisplayRequestPacket) and self.state != WorkerState.MEASURE:
+            yield from self.dispatch_print(response.printer_status)
+        return response
+
+    def dispatch_print(self, printer_status: PrinterStatus) -> Generator[RequestPacket | float, ResponseFrame | None, None]:
+        # 직전 'D' 응답의 PS 가 정상일 때만 한 건 보낸다 (전송중/용지없음일 때 보내면 통신 에러)
+        if printer_status != PrinterStatus.NORMAL:
+            if printer_status == PrinterStatus.NO_PAPER and not self.paper_out:
+                self.paper_out = True
+                self.logger.warning("hw.printer.paper_out", queued=len(self.print_spool))
+            return
+        if self.paper_out:
+            self.paper_out = False
+            self.logger.info("hw.printer.paper_restored", queued=len(self.print_spool))
+
+        job = self.print_spool.peek()
+        self.logger.info("hw.printer.command.sending", job_id=job.uuid, payload_length=len(job.document))
+        try:
+            response = yield PrinterRequestPacket(document_bytes=job.document)
+        except ValueError:
+            # 응답을 못 읽었으면 출력 여부를 알 수 없다: 전표를 잃는 것보다 다시 찍는 편이 낫다
+            self.logger.warning("hw.printer.job.unconfirmed", job_id=job.uuid, action="retry")
+            return
+        finally:
+            # 출력 전송이 회선을 점유한 시간은 폴링 지연으로 치지 않는다
+            self.scheduler.reset()
+        self.capture_input(response)
+
+        if response.printer_status == PrinterStatus.NO_PAPER:
+            # 용지가 없어 버려진 출력: 대기열에 남겨 두었다가 용지가 채워지면 다시 보낸다
+            self.paper_out = True
+            self.logger.warning("hw.printer.paper_out", job_id=job.uuid, queued=len(self.print_spool))
+            return
+
+        self.print_spool.complete(job)
+        self.logger.info("hw.printer.job.completed", job_id=job.uuid, queued=len(self.print_spool))
+
+    def capture_input(self, response: ResponseFrame):
+        # 거래 중에 같은 카드를 다시 댄 것은 버린다 (같은 트럭을 두 번 계량하지 않도록)
+        ignore_uid = self.last_plate if self.state != WorkerState.IDLE else None
+        if self.inputs.capture(time.monotonic(), response, ignore_uid) and self.state != WorkerState.IDLE:
+            self.logger.info(
+                "hw.input.buffered",
+                rfid_card_uid=response.rfid_card_uid if response.has_rfid_card else None,
+                user_command_code=response.user_command_code.name,
+                buffered=len(self.inputs),
+            )
+
+    def observe(self, response: ResponseFrame):
+        self.last_weight = response.weight_value
+        self.stabilizer.add(time.monotonic(), response)
+
     def initialize(self) -> WorkerState:
         self.logger.info("sys.worker.startup", next_state="CONNECT")
         return WorkerState.CONNECT
@@ -427,44 +992,70 @@ class WeighingStationWorker:
     def connect(self) -> WorkerState:
         self.logger.debug("hw.serial.connecting")
         self.client.connect()
+        self.scheduler.reset()
         self.logger.info("hw.serial.connected", next_state="IDLE")
         return WorkerState.IDLE
 
-    def idle(self) -> WorkerState:
+    def idle(self) -> WorkerStep:
         request = DisplayRequestPacket(display_weight=self.last_weight)
-        response = self.client.send_and_receive(request)
-        self.last_weight = response.weight_value
-
-        if response.rfid_card_uid != "00000000":
-            self.last_plate = response.rfid_card_uid
+        response = yield from self.poll(request)
+        self.observe(response)
+
+        # 이번 응답의 입력도 poll 에서 버퍼에 들어가므로 버퍼만 보면 된다 (이전 거래 중에 받은 입력이 먼저)
+        now = time.monotonic()
+        key = self.inputs.take_key(now)
+        if key is not None:
+            self.handle_key(*key)
+
+        tag = self.inputs.take_tag(now)
+        if tag is not None:
+            tagged_at, rfid_card_uid = tag
+            self.last_plate = rfid_card_uid
+            # 이번 트럭의 샘플만으로 안정 여부를 판단하고 time_to_stable 도 여기서부터 잰다
+            self.stabilizer.reset()
+            self.transaction_started_at = now
             self.logger.info(
                 "hw.rfid.detected",
-                rfid_card_uid=response.rfid_card_uid,
+                rfid_card_uid=rfid_card_uid,
+                buffered_ms=round((now - tagged_at) * 1000, 1),
                 next_state="MEASURE",
             )
-            self.last_event = RFIDTaggedEvent(rfid_card_uid=response.rfid_card_uid)
+            self.last_event = RFIDTaggedEvent(rfid_card_uid=rfid_card_uid)
             self.on_event(self.last_event)
             return WorkerState.VERIFY
 
-        self.stop_event.wait(self.polling_interval)
         return WorkerState.IDLE
+
+    def handle_key(self, pressed_at: float, code: InputCode, value: str):
+        if code == InputCode.REPRINT and self.last_print_job is not None:
+            job = self.print_spool.submit(self.last_print_job.record_uuid, self.last_print_job.document)
+            self.logger.info("hw.printer.reprint.queued", job_id=job.uuid, record_uuid=job.record_uuid)
+            return
+        self.logger.info("hw.keypad.input.ignored", user_command_code=code.name, user_input=value)
     
-    def verify(self) -> WorkerState:
+    def verify(self) -> WorkerStep:
         self.logger.info("biz.rfid_card.verifying", rfid_card_uid=self.last_plate)
+        if not isinstance(self.last_event, RFIDTaggedEvent):
+            self.logger.error("sys.worker.invalid_event_type")
+            return WorkerState.IDLE
+
+        self.prepared_receipt = None
+        # 캐시에 없는 카드는 원격 조회가 안내 음성과 겹쳐 진행되도록 음성보다 먼저 판정을 시작
+        deadline = time.monotonic() + self.verify_timeout
+        verdict = self.rfid_validator(self.last_event)
         request = DisplayRequestPacket(
             display_weight=self.last_weight,
             display_plate=self.last_plate,
             voice_code=VoiceCode.PLEASE_WAIT,
         )
-        response = self.poll_until_voice_ends(request)
+        response = yield from self.poll_until_voice_ends(request)
         if self.stop_event.is_set():
             return WorkerState.IDLE
-        
-        if not isinstance(self.last_event, RFIDTaggedEvent):
-            self.logger.error("sys.worker.invalid_event_type")
-            return WorkerState.IDLE
 
-        is_valid = self.rfid_validator(self.last_event)
+        if isinstance(verdict, Future):
+            verdict = yield from self.wait_for_verdict(verdict, deadline)
+
+        is_valid = verdict
         if not is_valid:
             self.logger.info("biz.rfid_card.unregistered", next_state="IDLE")
             request = DisplayRequestPacket(
@@ -473,17 +1064,77 @@ class WeighingStationWorker:
                 red_blink=True,
                 voice_code=VoiceCode.UNREGISTERED_CARD,
             )
-            response = self.poll_until_voice_ends(request)
+            response = yield from self.poll_until_voice_ends(request)
             return WorkerState.IDLE
 
         self.logger.info("biz.rfid_card.verified", next_state="MEASURE")
+        if self.receipt_preparer is not None:
+            try:
+                self.prepared_receipt = self.receipt_preparer(self.last_event)
+            except Exception:
+                self.logger.exception("hw.printer.receipt.prepare_failed", rfid_card_uid=self.last_plate)
         return WorkerState.MEASURE
     
-    def measure(self) -> WorkerState:
+    def wait_for_verdict(self, verdict: Future, deadline: float) -> Generator[RequestPacket | float, ResponseFrame | None, bool]:
+        # 스레드를 막고 기다리지 않고 폴링을 이어간다: 멀티플렉스 엔진에서 같은 스레드의 다른 계근대가 멈추지 않도록
+        while not verdict.done():
+            if time.monotonic() >= deadline or self.stop_event.is_set():
+                self.logger.warning("biz.rfid_card.verify_timeout", rfid_card_uid=self.last_plate)
+                return False
+            request = DisplayRequestPacket(display_weight=self.last_weight, display_plate=self.last_plate)
+            try:
+                response = yield from self.poll(request)
+                self.observe(response)
+            except ValueError:
+                self.logger.warning("hw.protocol.parse_error", action="ignore_and_continue")
+
+        try:
+            return bool(verdict.result())
+        except Exception:
+            self.logger.exception("biz.rfid_card.verify_failed", rfid_card_uid=self.last_plate)
+            return False
+
+    def measure(self) -> WorkerStep:
         self.logger.info("hw.weighing.started")
-        self.last_event = WeighingCompletedEvent(rfid_card_uid=self.last_plate, weight=int(self.last_weight))
+        started_at = time.monotonic()
+        rules = self.stabilizer.rules
+
+        # VERIFY 중에 쌓인 샘플도 판단에 포함되므로 이미 안정된 상태라면 즉시 확정
+        while not self.stabilizer.is_final(time.monotonic()):
+            if self.stop_event.is_set():
+                return WorkerState.IDLE
+
+            if time.monotonic() - started_at >= rules.timeout:
+                self.logger.warning(
+                    "hw.weighing.stabilize_timeout",
+                    timeout=rules.timeout,
+                    weight=str(self.last_weight),
+                    next_state="IDLE",
+                )
+                request = DisplayRequestPacket(
+                    display_weight=self.last_weight,
+                    display_plate=self.last_plate,
+                    red_blink=True,
+                    voice_code=VoiceCode.CHECK_ADMIN,
+                )
+                response = yield from self.poll_until_voice_ends(request)
+                return WorkerState.IDLE
+
+            request = DisplayRequestPacket(display_weight=self.last_weight, display_plate=self.last_plate)
+            try:
+                response = yield from self.poll(request)
+                self.observe(response)
+            except ValueError:
+                self.logger.warning("hw.protocol.parse_error", action="ignore_and_continue")
+
+        time_to_stable = time.monotonic() - self.transaction_started_at
+        self.last_event = WeighingCompletedEvent(
+            rfid_card_uid=self.last_plate,
+            weight=int(self.last_weight),
+            time_to_stable=time_to_stable,
+        )
         self.on_event(self.last_event)
-        self.logger.info("hw.weighing.completed", next_state="PRINT")
+        self.logger.info("hw.weighing.completed", time_to_stable=round(time_to_stable, 3), next_state="PRINT")
 
         request = DisplayRequestPacket(
             display_weight=self.last_weight,
@@ -491,20 +1142,27 @@ class WeighingStationWorker:
             green_blink=True,
             voice_code=VoiceCode.WEIGHT_COMPLETE,
         )
-        response = self.poll_until_voice_ends(request)
+        response = yield from self.poll_until_voice_ends(request)
         return WorkerState.PRINT
     
-    def print(self) -> WorkerState:
+    def print(self) -> WorkerStep:
         receipt_bytes = None
-        if self.receipt_builder is not None and isinstance(self.last_event, WeighingCompletedEvent):
-            receipt_bytes = self.receipt_builder(self.last_event)
-        
-        if receipt_bytes:
-            self.logger.info("hw.printer.command.sending", payload_length = len(receipt_bytes))
-            request = PrinterRequestPacket(document_bytes=receipt_bytes)
-            response = self.client.send_and_receive(request)
-            self.last_weight = response.weight_value
+        if isinstance(self.last_event, WeighingCompletedEvent):
+            if self.prepared_receipt is not None:
+                receipt_bytes = self.prepared_receipt(self.last_event)
+            elif self.receipt_builder is not None:
+                receipt_bytes = self.receipt_builder(self.last_event)
+        self.prepared_receipt = None
 
+        if receipt_bytes:
+            job = self.print_spool.submit(self.last_event.uuid, receipt_bytes)
+            self.last_print_job = job
+            self.logger.info(
+                "hw.printer.job.queued",
+                job_id=job.uuid,
+                payload_length=len(receipt_bytes),
+                queued=len(self.print_spool),
+            )
 
         request = DisplayRequestPacket(
             display_weight=self.last_weight,
@@ -512,17 +1170,17 @@ class WeighingStationWorker:
             green_blink=True,
             voice_code=VoiceCode.THANK_YOU,
         )
-        response = self.poll_until_voice_ends(request)
+        response = yield from self.poll_until_voice_ends(request)
 
         self.last_plate = ""
         self.last_event = None
         return WorkerState.IDLE
 
-    def recover(self) -> WorkerState:
+    def recover(self) -> WorkerStep:
         self.logger.info("sys.worker.recovery_scheduled", retry_in=self.retry_interval, next_state="CONNECT")
         self.client.disconnect()
 
-        self.stop_event.wait(self.retry_interval)
+        yield self.retry_interval
         return WorkerState.CONNECT
 
 
@@ -0,0 +1,58 @@
+from cache import MarketSnapshot
+
+
+def make_snapshot() -> MarketSnapshot:
+    snapshot = MarketSnapshot()
+    snapshot.upsert_producer(1, "김어민")
+    snapshot.upsert_producer(2, "이어민")
+    snapshot.upsert_species(10, "광어")
+    snapshot.append("0000000A", True, snapshot.producer_slots[1], snapshot.species_slots[10])
+    snapshot.append("0000000B", True, snapshot.producer_slots[2], snapshot.species_slots[10])
+    snapshot.append("card-x", True, snapshot.producer_slots[1], snapshot.species_slots[10])
+    return snapshot
+
+
+def test_reinserted_producer_does_not_revive_cascaded_cards():
+    snapshot = make_snapshot()
+    assert snapshot.upsert_card("0000000C", True, 1, 10)
+
+    snapshot.delete_producer(1)
+    snapshot.upsert_producer(1, "김어민")
+
+    assert snapshot.info("0000000A") is None
+    assert snapshot.info("0000000C") is None
+    assert snapshot.info("card-x") is None
+    assert snapshot.info("0000000B").producer_name == "이어민"
+
+    assert snapshot.upsert_card("0000000A", False, 1, 10)
+    assert snapshot.info("0000000A").is_active is False
+
+
+def test_reinserted_species_does_not_revive_cascaded_cards():
+    snapshot = make_snapshot()
+
+    snapshot.delete_species(10)
+    snapshot.upsert_species(10, "광어")
+
+    assert snapshot.info("0000000A") is None
+    assert snapshot.info("0000000B") is None
+
+
+def test_upsert_card_with_unknown_parent_removes_old_entry():
+    snapshot = make_snapshot()
+
+    assert not snapshot.upsert_card("0000000A", True, 99, 10)
+    assert snapshot.info("0000000A") is None
+    assert not snapshot.upsert_card("0000000B", True, 2, 99)
+    assert snapshot.info("0000000B") is None
+
+
+def test_deleted_producer_keeps_cards_patched_to_another_producer():
+    snapshot = make_snapshot()
+    assert snapshot.upsert_card("0000000A", True, 2, 10)
+    assert snapshot.upsert_card("card-x", True, 2, 10)
+
+    snapshot.delete_producer(1)
+
+    assert snapshot.info("0000000A").producer_name == "이어민"
+    assert snapshot.info("card-x").producer_name == "이어민"
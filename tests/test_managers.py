@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+import managers
+from api import APIClient
+from cache import MarketDataCache
+from events import RFIDTaggedEvent, WeighingCompletedEvent
+from managers import WeighingStationManager
+from resolver import RemoteRFIDResolver
+
+
+class IdleThread:
+    def __init__(self, target, name, daemon):
+        self.name = name
+
+    def start(self):
+        pass
+
+
+def test_remote_only_card_gets_a_receipt(monkeypatch):
+    uid = "0A1B2C3D"
+    market_cache = MarketDataCache()
+    market_cache.snapshot.upsert_producer(1, "김어민")
+    market_cache.snapshot.upsert_species(10, "광어")
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[{
+            "id": 7, "uid": uid, "producer": 1, "species": 10, "is_active": True,
+        }])
+
+    async def save_card(card: dict):
+        pass
+
+    async def resolve() -> bool:
+        api_client = APIClient("http://server/")
+        await api_client.client.aclose()
+        api_client.client = httpx.AsyncClient(base_url="http://server/", transport=httpx.MockTransport(handle))
+        resolver = RemoteRFIDResolver(api_client, market_cache, lambda: "token", save_card)
+        try:
+            found = await resolver.lookup(uid)
+            await asyncio.gather(*resolver.saving)
+            return found
+        finally:
+            await api_client.close()
+
+    assert market_cache.get_rfid_info(uid) is None
+    assert asyncio.run(resolve())
+
+    monkeypatch.setattr(managers.threading, "Thread", IdleThread)
+    manager = WeighingStationManager(on_event=lambda event: None, market_cache=market_cache)
+    manager.start_worker(SimpleNamespace(id=1, name="1번 계근대", serial_port="/dev/null"))
+    worker = manager.workers[1].worker
+
+    tagged = RFIDTaggedEvent(rfid_card_uid=uid)
+    completed = WeighingCompletedEvent(rfid_card_uid=uid, weight=1250)
+    prepared = worker.receipt_preparer(tagged)
+    assert prepared is not None
+    for receipt in (prepared(completed), worker.receipt_builder(completed)):
+        assert "김어민".encode("cp949") in receipt
+        assert "광어".encode("cp949") in receipt
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, timezone
+import json
+import uuid
+
+import httpx
+
+from api import APIClient
+from models import Record
+from workers import RecordUploadWorker
+
+
+def make_records(count: int) -> list[Record]:
+    measured_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        Record(uuid=uuid.uuid4(), rfid_card_uid=f"{i:08X}", weight=1000 + i, measured_at=measured_at)
+        for i in range(count)
+    ]
+
+
+def test_rejected_batch_falls_back_to_per_record_uploads():
+    records = make_records(3)
+    bad = records[1]
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path.endswith("/batch/"):
+            return httpx.Response(422, json={"detail": "invalid record"})
+        payload = json.loads(request.content)
+        if payload["uuid"] == str(bad.uuid):
+            return httpx.Response(400, json={"weight": ["invalid"]})
+        return httpx.Response(201, json=payload)
+
+    async def run():
+        api_client = APIClient("http://server/")
+        await api_client.client.aclose()
+        api_client.client = httpx.AsyncClient(base_url="http://server/", transport=httpx.MockTransport(handle))
+        worker = RecordUploadWorker(api_client, asyncio.Event(), "token")
+        try:
+            return worker, await worker.post_batch(records)
+        finally:
+            await api_client.close()
+
+    worker, outcomes = asyncio.run(run())
+
+    assert {record_uuid: outcome for record_uuid, (outcome, _) in outcomes.items()} == {
+        str(records[0].uuid): "success",
+        str(bad.uuid): "rejected",
+        str(records[2].uuid): "success",
+    }
+    assert requests.count("/weighing/api/records/") == 3
+    assert worker.batch_supported
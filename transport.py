@@ -0,0 +1,94 @@
+# transport.py
+from array import array
+import asyncio
+from collections import deque
+import threading
+import time
+
+from events import BaseEvent
+
+
+class EventTransport:
+    # 하드웨어 스레드 -> 이벤트 루프 전달
+    # - 생산자는 deque 에 넣기만 한다 (append 는 스레드 안전, 락 없음)
+    # - 루프가 비운 뒤 처음 들어온 이벤트만 루프를 깨운다 (call_soon_threadsafe = 락 + self-pipe 쓰기)
+    # - 깨어난 뒤 coalesce_window 동안 더 모아서 한 번에 넘긴다
+    def __init__(self, coalesce_window: float = 0.0, capacity: int = 1024):
+        self.coalesce_window = coalesce_window
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+        self.buffer: deque[tuple[float, BaseEvent]] = deque()
+        self.ready = asyncio.Event()
+        self.wakeup_scheduled = False
+        self.wakeup_lock = threading.Lock()
+
+        self.events = 0
+        self.wakeups = 0
+        self.batches = 0
+        self.depth_max = 0
+        self.capacity = capacity
+        self.latencies = array("d", bytes(8 * capacity))
+        self.latency_index = 0
+        self.latency_count = 0
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def put(self, event: BaseEvent):
+        # 계근대 스레드에서 호출
+        self.buffer.append((time.monotonic(), event))
+        if self.wakeup_scheduled:
+            return
+        with self.wakeup_lock:
+            if self.wakeup_scheduled:
+                return
+            self.wakeup_scheduled = True
+            self.wakeups += 1
+        self.loop.call_soon_threadsafe(self.ready.set)
+
+    async def get_batch(self, max_size: int) -> list[BaseEvent]:
+        while True:
+            if not self.buffer:
+                await self.ready.wait()
+                self.ready.clear()
+                if self.coalesce_window > 0 and len(self.buffer) < max_size:
+                    await asyncio.sleep(self.coalesce_window)
+
+            # 비우기 전에 내려야 이후에 들어온 이벤트가 다시 깨운다 (이번에 같이 가져가면 빈 깨움 한 번)
+            self.wakeup_scheduled = False
+            depth = len(self.buffer)
+            if not depth:
+                continue
+
+            now = time.monotonic()
+            batch = []
+            while self.buffer and len(batch) < max_size:
+                enqueued_at, event = self.buffer.popleft()
+                batch.append(event)
+                self.latencies[self.latency_index] = now - enqueued_at
+                self.latency_index = (self.latency_index + 1) % self.capacity
+                self.latency_count = min(self.latency_count + 1, self.capacity)
+
+            self.events += len(batch)
+            self.batches += 1
+            self.depth_max = max(self.depth_max, depth)
+            return batch
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies[:self.latency_count])
+
+        def percentile(samples, q: float):
+            if not samples:
+                return None
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "transport_events": self.events,
+            "transport_wakeups": self.wakeups,
+            "transport_batches": self.batches,
+            "transport_depth": len(self.buffer),
+            "transport_depth_max": self.depth_max,
+            "transport_latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+            "transport_latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+            "transport_latency_max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+        }
@@ -1,77 +1,433 @@
 # workers.py
+from array import array
 import asyncio
+from datetime import datetime, timedelta, timezone as dt_timezone
+import random
+
 import httpx
 from structlog.stdlib import get_logger
+from tortoise import Tortoise, timezone
+from tortoise.transactions import in_transaction
 
 from api import APIClient, AuthDegradedError, RecordCreateDTO
-from models import Record
+from events import WeighingCompletedEvent
+from models import OutboxStatus, Record, UploadOutbox
+
+
+class RecordWriter:
+    # group commit: 짧은 시간에 몰린 계근 완료 이벤트를 한 트랜잭션에서 다중 행 INSERT 한 번으로 저장
+    def __init__(self, capacity: int = 1024):
+        self.logger = get_logger()
+        self.commits = 0
+        self.records = 0
+
+        self.capacity = capacity
+        self.batch_sizes = array("I", bytes(4 * capacity))
+        self.commit_index = 0
+        self.commit_count = 0
+        self.latencies = array("d", bytes(8 * capacity))
+        self.latency_index = 0
+        self.latency_count = 0
+
+    async def write(self, events: list[WeighingCompletedEvent]) -> list[WeighingCompletedEvent]:
+        try:
+            await self.insert_many(events)
+            return events
+        except Exception:
+            if len(events) == 1:
+                raise
+            # 한 건 때문에 그룹 전체를 잃지 않도록 한 건씩 다시 저장
+            self.logger.warning("sys.db.group_commit.split", size=len(events))
+
+        written = []
+        for event in events:
+            try:
+                await self.insert_many([event])
+                written.append(event)
+            except Exception:
+                self.logger.exception("biz.record.local_save_failed", event_id=event.uuid)
+        return written
+
+    async def insert_many(self, events: list[WeighingCompletedEvent]):
+        record_fields = Record._meta.fields_map
+        outbox_fields = UploadOutbox._meta.fields_map
+        next_attempt_at = outbox_fields["next_attempt_at"].to_db_value(timezone.now(), UploadOutbox)
+
+        record_values, outbox_values = [], []
+        for event in events:
+            record_uuid = record_fields["uuid"].to_db_value(event.uuid, Record)
+            record_values += [
+                record_uuid,
+                record_fields["rfid_card_uid"].to_db_value(event.rfid_card_uid, Record),
+                record_fields["weight"].to_db_value(event.weight, Record),
+                record_fields["measured_at"].to_db_value(event.timestamp, Record),
+            ]
+            outbox_values += [record_uuid, OutboxStatus.PENDING.value, next_attempt_at]
+
+        async with in_transaction() as connection:
+            await connection.execute_query(
+                'INSERT INTO "record" ("uuid", "rfid_card_uid", "weight", "measured_at") VALUES '
+                + ", ".join(["(?, ?, ?, ?)"] * len(events)),
+                record_values,
+            )
+            await connection.execute_query(
+                'INSERT INTO "upload_outbox" ("record_id", "status", "attempts", "next_attempt_at") VALUES '
+                + ", ".join(["(?, ?, 0, ?)"] * len(events)),
+                outbox_values,
+            )
+
+        committed_at = datetime.now()
+        self.commits += 1
+        self.records += len(events)
+        self.batch_sizes[self.commit_index] = len(events)
+        self.commit_index = (self.commit_index + 1) % self.capacity
+        self.commit_count = min(self.commit_count + 1, self.capacity)
+        for event in events:
+            # 이벤트 발생(하드웨어 스레드) -> 커밋 완료까지
+            self.latencies[self.latency_index] = (committed_at - event.timestamp).total_seconds()
+            self.latency_index = (self.latency_index + 1) % self.capacity
+            self.latency_count = min(self.latency_count + 1, self.capacity)
+
+    def stats(self) -> dict:
+        sizes = sorted(self.batch_sizes[:self.commit_count])
+        latencies = sorted(self.latencies[:self.latency_count])
+
+        def percentile(samples, q: float):
+            if not samples:
+                return None
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "commits": self.commits,
+            "records": self.records,
+            "batch_p50": percentile(sizes, 0.50),
+            "batch_max": sizes[-1] if sizes else None,
+            "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+            "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+            "latency_max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+        }
+
+
+class RetryBackoff:
+    # 레코드별 지수 백오프(equal jitter)
+    def __init__(self, base_delay: float = 5.0, max_delay: float = 300.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
 
 
 class RecordUploadWorker:
-    def __init__(self, api_client: APIClient, upload_queue: asyncio.Queue[str], access_token: str):
+    def __init__(
+        self,
+        api_client: APIClient,
+        upload_wakeup: asyncio.Event,
+        access_token: str,
+        batch_size: int = 100,
+        batch_window: float = 0.2,
+        concurrency: int = 4,
+        backfill_page_size: int = 500,
+    ):
         self.api_client = api_client
-        self.upload_queue = upload_queue
+        # 업로드 대상은 UploadOutbox 테이블이 관리, 이벤트는 새 레코드가 생겼다는 신호일 뿐
+        self.upload_wakeup = upload_wakeup
         self.access_token = access_token
         self.logger = get_logger()
-        self.retry_delay = 5.0
+        self.backoff = RetryBackoff(base_delay=5.0, max_delay=300.0)
+        # 네트워크 단절 시 백로그 전체를 한 바퀴씩 돌며 실패하지 않도록 전역 일시정지
+        self.offline_streak = 0
+        self.resume_at = 0.0
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        # 서버가 배치 엔드포인트를 지원하지 않으면(404/405) 이후로는 건별 업로드
+        self.batch_supported = True
+        # 동시에 진행 중인 HTTP 요청 수 상한 (배치 POST, 건별 POST 공통)
+        self.concurrency = concurrency
+        self.in_flight = asyncio.Semaphore(concurrency)
+        self.backfill_page_size = backfill_page_size
+        # 이 시각 이후로 예약된 항목(이번 세션의 새 레코드, 재시도)은 백로그보다 먼저 가져간다
+        self.live_since = timezone.now()
 
     async def run(self):
-        self.logger.info("sys.worker.record_upload.started")
+        self.logger.info(
+            "sys.worker.record_upload.started",
+            batch_size=self.batch_size,
+            batch_window=self.batch_window,
+            concurrency=self.concurrency,
+        )
+
+        # 이전 세션에서 전송 중에 끊긴 항목은 다시 대기 상태로
+        released = await UploadOutbox.filter(status=OutboxStatus.IN_FLIGHT).update(status=OutboxStatus.PENDING)
+        if released:
+            self.logger.info("sys.worker.record_upload.claims_released", count=released)
+
+        self.live_since = timezone.now()
 
+        # 401/403 으로 AuthDegradedError 가 발생하면 TaskGroup 이 진행 중인 업로드를 모두 취소한다
+        pending_batches = asyncio.Semaphore(self.concurrency)
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(self.backfill())
+            while True:
+                await pending_batches.acquire()
+                await self.wait_until_online()
+                claims = await self.next_batch()
+                tg.create_task(self.process_batch(claims, pending_batches))
+
+    async def process_batch(self, claims: dict[str, int], pending_batches: asyncio.Semaphore):
+        try:
+            await self.upload_batch(claims)
+        finally:
+            pending_batches.release()
+
+    async def wait_until_online(self):
+        loop = asyncio.get_running_loop()
+        while (remaining := self.resume_at - loop.time()) > 0:
+            await asyncio.sleep(remaining)
+
+    async def backfill(self):
+        # 아웃박스 행이 없는 레코드(오프라인 중 이전 버전이 저장한 레코드 등)를 measured_at 순 keyset 페이지로 채운다
+        # 페이지 경계만 조회하고 INSERT ... SELECT 로 넣으므로 메모리에는 레코드를 올리지 않는다
+        # UNIQUE(record_id) 이므로 이미 대기 중인 레코드는 중복 등록되지 않는다
+        # measured_at 은 keyset 커서로만 쓴다: 로컬 시각이라 UTC 인 next_attempt_at 으로 쓰면 시간대만큼 밀리고 live 로 잘못 분류된다
+        # next_attempt_at 은 live_since 보다 앞선 epoch 로 두어 바로 대상이 되고 live 항목 뒤(id = measured_at 순)로 정렬되게 한다
+        due_at = UploadOutbox._meta.fields_map["next_attempt_at"].to_db_value(
+            datetime(1970, 1, 1, tzinfo=dt_timezone.utc), UploadOutbox
+        )
+        connection = Tortoise.get_connection("default")
+        cursor = ["", ""]
+        backfilled = 0
         while True:
-            record_uuid = await self.upload_queue.get()
+            boundary = await connection.execute_query_dict(
+                'SELECT "measured_at", "uuid" FROM "record" WHERE ("measured_at", "uuid") > (?, ?) '
+                'ORDER BY "measured_at", "uuid" LIMIT 1 OFFSET ?',
+                [*cursor, self.backfill_page_size - 1],
+            )
+            query = (
+                'INSERT OR IGNORE INTO "upload_outbox" ("record_id", "status", "attempts", "next_attempt_at") '
+                'SELECT "uuid", ?, 0, ? FROM "record" WHERE ("measured_at", "uuid") > (?, ?)'
+            )
+            values = [OutboxStatus.PENDING.value, due_at, *cursor]
+            if boundary:
+                query += ' AND ("measured_at", "uuid") <= (?, ?)'
+                values += [boundary[0]["measured_at"], boundary[0]["uuid"]]
+            inserted, _ = await connection.execute_query(query, values)
 
+            if inserted:
+                backfilled += inserted
+                self.upload_wakeup.set()
+            if not boundary:
+                break
+            cursor = [boundary[0]["measured_at"], boundary[0]["uuid"]]
+
+        if backfilled:
+            self.logger.info("sys.recovery.records_enqueued", count=backfilled)
+
+    async def claim(self, limit: int) -> dict[str, int]:
+        # (status, next_attempt_at) 인덱스를 타는 LIMIT 조회 후 IN_FLIGHT 로 표시
+        # 표시된 행은 다음 조회에서 제외되므로 같은 레코드가 중복으로 전송되지 않는다
+        # 새 레코드가 백로그 전체를 기다리지 않도록 live 항목을 먼저 채우고 남는 자리를 백로그(measured_at 순)로 채운다
+        due = UploadOutbox.filter(status=OutboxStatus.PENDING, next_attempt_at__lte=timezone.now())
+        async with in_transaction():
+            rows = await (
+                due
+                .filter(next_attempt_at__gte=self.live_since)
+                .order_by("next_attempt_at", "id")
+                .limit(limit)
+                .values_list("id", "record_id", "attempts")
+            )
+            if len(rows) < limit:
+                rows += await (
+                    due
+                    .filter(next_attempt_at__lt=self.live_since)
+                    .order_by("next_attempt_at", "id")
+                    .limit(limit - len(rows))
+                    .values_list("id", "record_id", "attempts")
+                )
+            if rows:
+                await UploadOutbox.filter(id__in=[row[0] for row in rows]).update(status=OutboxStatus.IN_FLIGHT)
+        return {str(record_id): attempts for _, record_id, attempts in rows}
+
+    async def next_batch(self) -> dict[str, int]:
+        loop = asyncio.get_running_loop()
+        while True:
+            self.upload_wakeup.clear()
+            claims = await self.claim(self.batch_size)
+            if claims:
+                break
+
+            next_attempt_at = await (
+                UploadOutbox
+                .filter(status=OutboxStatus.PENDING)
+                .order_by("next_attempt_at")
+                .first()
+                .values_list("next_attempt_at", flat=True)
+            )
+            timeout = None
+            if next_attempt_at is not None:
+                timeout = max(0.0, (next_attempt_at - timezone.now()).total_seconds())
             try:
-                record = await Record.get_or_none(uuid=record_uuid)
+                await asyncio.wait_for(self.upload_wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
 
-                if not record:
-                    self.logger.debug("biz.record.already_purged_or_missing", uuid=record_uuid)
-                    continue
+        # 이어서 생성되는 레코드를 batch_window 동안 또는 batch_size 가 찰 때까지 모은다
+        deadline = loop.time() + self.batch_window
+        while len(claims) < self.batch_size and (remaining := deadline - loop.time()) > 0:
+            self.upload_wakeup.clear()
+            try:
+                await asyncio.wait_for(self.upload_wakeup.wait(), remaining)
+            except TimeoutError:
+                break
+            claims.update(await self.claim(self.batch_size - len(claims)))
+        return claims
 
-                await self.api_client.create_record(
+    async def upload_batch(self, claims: dict[str, int]):
+        records = await Record.filter(uuid__in=list(claims))
+        if self.batch_supported:
+            outcomes = await self.post_batch(records)
+        else:
+            outcomes = await self.post_each(records)
+        await self.settle(claims, outcomes)
+
+    async def settle(self, claims: dict[str, int], outcomes: dict[str, tuple[str, str | None]]):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        offline = [record_uuid for record_uuid, (outcome, _) in outcomes.items() if outcome == "offline"]
+        succeeded = [record_uuid for record_uuid, (outcome, _) in outcomes.items() if outcome == "success"]
+        if offline and now >= self.resume_at:
+            # 이미 일시정지 중에 실패한 동시 요청들로는 백오프를 더 늘리지 않는다
+            self.offline_streak += 1
+            self.resume_at = now + self.backoff.delay(self.offline_streak)
+            self.logger.warning(
+                "net.api.record_upload.network_offline",
+                count=len(offline),
+                streak=self.offline_streak,
+                paused_for=round(self.resume_at - now, 1),
+            )
+        elif succeeded:
+            self.offline_streak = 0
+
+        wall_now = timezone.now()
+        retry = 0
+        async with in_transaction():
+            if succeeded:
+                # UploadOutbox 행은 ON DELETE CASCADE 로 함께 삭제
+                await Record.filter(uuid__in=succeeded).delete()
+            if offline:
+                # 단절은 레코드 탓이 아니므로 시도 횟수를 늘리지 않고 일시정지 해제 시점에 재시도
+                await UploadOutbox.filter(record_id__in=offline).update(
+                    status=OutboxStatus.PENDING,
+                    next_attempt_at=wall_now + timedelta(seconds=self.resume_at - now),
+                    last_error=outcomes[offline[0]][1],
+                )
+            for record_uuid, (outcome, error) in outcomes.items():
+                match outcome:
+                    case "rejected":
+                        await UploadOutbox.filter(record_id=record_uuid).update(
+                            status=OutboxStatus.REJECTED,
+                            last_error=error,
+                        )
+                    case "retry":
+                        attempts = claims[record_uuid] + 1
+                        await UploadOutbox.filter(record_id=record_uuid).update(
+                            status=OutboxStatus.PENDING,
+                            attempts=attempts,
+                            next_attempt_at=wall_now + timedelta(seconds=self.backoff.delay(attempts)),
+                            last_error=error,
+                        )
+                        retry += 1
+
+        if succeeded:
+            self.logger.info("biz.record.upload_success_and_purged", count=len(succeeded))
+        if retry:
+            self.logger.info("sys.worker.record_upload.retry_scheduled", count=retry)
+
+    async def post_batch(self, records: list[Record]) -> dict[str, tuple[str, str | None]]:
+        try:
+            async with self.in_flight:
+                results = await self.api_client.create_records_batch(
                     access_token=self.access_token,
-                    record=RecordCreateDTO(
-                        uuid=record.uuid,
-                        rfid_card_uid=record.rfid_card_uid,
-                        weight=record.weight,
-                        measured_at=record.measured_at,
-                    ),
+                    records=[self.to_dto(record) for record in records],
                 )
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            if status_code in (404, 405):
+                self.logger.warning("net.api.record_upload.batch_unsupported", status=status_code, fallback="per_record")
+                self.batch_supported = False
+                return await self.post_each(records)
+            if 400 <= status_code < 500 and status_code not in (401, 403):
+                # 배치 전체가 4xx 면 어느 레코드 탓인지 모른다: 이 배치만 건별로 다시 보내 문제 레코드만 거부
+                self.logger.warning("net.api.record_upload.batch_rejected", status=status_code, fallback="per_record")
+                return await self.post_each(records)
+            outcome = self.classify(f"batch({len(records)})", status_code, e.response.text)
+            return {str(record.uuid): (outcome, f"HTTP {status_code}") for record in records}
+        except httpx.RequestError as e:
+            return {str(record.uuid): ("offline", repr(e)) for record in records}
 
-                await record.delete()
-                self.logger.info("biz.record.upload_success_and_purged", uuid=record_uuid)
+        statuses = {str(result["uuid"]): result for result in results}
+        outcomes = {}
+        for record in records:
+            record_uuid = str(record.uuid)
+            result = statuses.get(record_uuid)
+            if result is None:
+                outcomes[record_uuid] = ("retry", "missing from batch results")
+                continue
+            errors = result.get("errors")
+            outcome = self.classify(record_uuid, result["status"], errors)
+            outcomes[record_uuid] = (outcome, f"HTTP {result['status']}: {errors}" if errors else f"HTTP {result['status']}")
+        return outcomes
 
-            except httpx.HTTPStatusError as e:
-                status_code = e.response.status_code
-                match status_code:
-                    case 401 | 403:
-                        self.logger.error("net.api.record_upload.auth_rejected", status=status_code)
-                        raise AuthDegradedError("Token expired during upload")
-                    case 400 | 422:
-                        self.logger.critical(
-                            "biz.record.upload_permanently_rejected",
-                            uuid=record_uuid,
-                            status=status_code,
-                            response=e.response.text,
-                        )
-                    case _ if status_code >= 500:
-                        self.logger.error("net.api.record_upload.server_down", status=status_code)
-                        await self._requeue(record_uuid)
-                    case _:
-                        self.logger.warning("net.api.record_upload.unhandlected_status", status=status_code)
-                        await self._requeue(record_uuid)
+    async def post_each(self, records: list[Record]) -> dict[str, tuple[str, str | None]]:
+        async with asyncio.TaskGroup() as tg:
+            tasks = {str(record.uuid): tg.create_task(self.post_one(record)) for record in records}
+        return {record_uuid: task.result() for record_uuid, task in tasks.items()}
 
-            except httpx.RequestError:
-                self.logger.warning("net.api.record_upload.network_offline")
-                await self._requeue(record_uuid)
+    async def post_one(self, record: Record) -> tuple[str, str | None]:
+        record_uuid = str(record.uuid)
+        try:
+            async with self.in_flight:
+                if self.resume_at > asyncio.get_running_loop().time():
+                    return "offline", "paused while offline"
+                await self.api_client.create_record(access_token=self.access_token, record=self.to_dto(record))
+            return "success", None
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            return self.classify(record_uuid, status_code, e.response.text), f"HTTP {status_code}: {e.response.text}"
+        except httpx.RequestError as e:
+            return "offline", repr(e)
 
-            finally:
-                self.upload_queue.task_done()
+    def classify(self, record_uuid: str, status_code: int, response) -> str:
+        match status_code:
+            case _ if 200 <= status_code < 300:
+                return "success"
+            case 401 | 403:
+                self.logger.error("net.api.record_upload.auth_rejected", status=status_code)
+                raise AuthDegradedError("Token expired during upload")
+            case 400 | 422:
+                self.logger.critical(
+                    "biz.record.upload_permanently_rejected",
+                    uuid=record_uuid,
+                    status=status_code,
+                    response=response,
+                )
+                return "rejected"
+            case _ if status_code >= 500:
+                self.logger.error("net.api.record_upload.server_down", status=status_code)
+                return "retry"
+            case _:
+                self.logger.warning("net.api.record_upload.unhandlected_status", status=status_code)
+                return "retry"
 
-    async def _requeue(self, record_uuid: str):
-        self.logger.info("sys.worker.record_upload.requeue", uuid=record_uuid, delay=self.retry_delay)
-        await asyncio.sleep(self.retry_delay)
-        await self.upload_queue.put(record_uuid)
+    @staticmethod
+    def to_dto(record: Record) -> RecordCreateDTO:
+        return RecordCreateDTO(
+            uuid=record.uuid,
+            rfid_card_uid=record.rfid_card_uid,
+            weight=record.weight,
+            measured_at=record.measured_at,
+        )
 
 
 class HeartbeatWorker:
@@ -100,3 +456,37 @@ class HeartbeatWorker:
                 self.logger.warning("net.api.heartbeat.network_error")
 
             await asyncio.sleep(self.interval)
+
+
+class StorageMaintenanceWorker:
+    # WAL 파일이 계속 커지지 않도록 주기적으로 checkpoint, 쿼리 플래너 통계는 optimize 로 갱신
+    def __init__(self, checkpoint_interval: float = 300.0, optimize_interval: float = 3600.0):
+        self.checkpoint_interval = checkpoint_interval
+        self.optimize_interval = optimize_interval
+        self.logger = get_logger()
+
+    async def run(self):
+        self.logger.info(
+            "sys.worker.storage_maintenance.started",
+            checkpoint_interval=self.checkpoint_interval,
+            optimize_interval=self.optimize_interval,
+        )
+        loop = asyncio.get_running_loop()
+        next_optimize = loop.time() + self.optimize_interval
+
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                connection = Tortoise.get_connection("default")
+                # PASSIVE: 읽기/쓰기를 막지 않고 가능한 만큼만 옮긴다
+                _, rows = await connection.execute_query("PRAGMA wal_checkpoint(PASSIVE)")
+                busy, wal_pages, checkpointed = rows[0]
+                self.logger.debug("sys.db.maintenance.checkpoint", busy=busy, wal_pages=wal_pages, checkpointed=checkpointed)
+
+                if loop.time() >= next_optimize:
+                    await connection.execute_script("PRAGMA optimize")
+                    next_optimize = loop.time() + self.optimize_interval
+                    self.logger.debug("sys.db.maintenance.optimized")
+
+            except Exception:
+                self.logger.exception("sys.db.maintenance.failed")